@@ -0,0 +1,100 @@
+"""Cohort statistics over every learner's progress in a curriculum.
+
+Progress is loaded into a learner x quest boolean matrix laid out in
+``QuestIndex`` order. Every statistic is then a column sum, a matrix product
+with the zone masks or a gather along the prerequisite edges. No step loops
+over learners in Python, which keeps tens of thousands of learners interactive.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Edges are compared in chunks so the learner x edge temporaries stay small
+EDGE_CHUNK = 512
+
+CohortReport = namedtuple(
+    "CohortReport",
+    ["learners", "completion_rate", "zones", "quests", "funnel", "xp", "levels"],
+)
+
+
+def completion_matrix(index, records):
+    """Return the learner ids and a learners x quests boolean matrix of completions."""
+    learner_ids = list(records)
+    positions = index.positions
+    columns = [[positions[q] for q in records[learner_id].completed if q in positions] for learner_id in learner_ids]
+    matrix = np.zeros((len(learner_ids), len(index)), dtype=bool)
+    rows = np.repeat(np.arange(len(learner_ids)), [len(row) for row in columns])
+    matrix[rows, np.fromiter((i for row in columns for i in row), dtype=np.int64, count=len(rows))] = True
+    return learner_ids, matrix
+
+
+def cohort_report(index, quests, records):
+    """Compute a ``CohortReport`` of DataFrames from {learner_id: ProgressRecord}."""
+    learner_ids, matrix = completion_matrix(index, records)
+    learners = len(learner_ids)
+    completed_by_quest = matrix.sum(axis=0)
+
+    quest_table = pd.DataFrame({
+        "quest": index.quest_ids,
+        "title": [quests[quest_id].title for quest_id in index.quest_ids],
+        "zone": [index.zones[code] for code in index.zone_codes],
+        "learners_completed": completed_by_quest,
+        "completion_rate": completed_by_quest / max(learners, 1),
+    })
+
+    # Per-learner share of each zone, then cohort aggregates per zone. Counting one
+    # zone's columns at a time never copies the whole matrix into a wider dtype.
+    zone_counts = np.zeros((learners, len(index.zones)), dtype=np.int64)
+    for zone, mask in enumerate(index.zone_masks):
+        zone_counts[:, zone] = np.count_nonzero(matrix[:, mask], axis=1)
+    zone_share = zone_counts / index.zone_sizes
+    zone_table = pd.DataFrame({
+        "zone": index.zones,
+        "quests": index.zone_sizes,
+        "completion_rate": zone_share.mean(axis=0) if learners else 0.0,
+        "learners_started": (zone_share > 0).sum(axis=0),
+        "learners_finished": (zone_share >= 1).sum(axis=0),
+    })
+
+    # Funnel: of the learners who finished a prerequisite, how many went on to its successor
+    sources = np.repeat(np.arange(len(index)), np.diff(index.successor_indptr))
+    targets = index.successor_indices
+    continued = np.zeros(len(sources), dtype=np.int64)
+    for start in range(0, len(sources), EDGE_CHUNK):
+        stop = start + EDGE_CHUNK
+        continued[start:stop] = (matrix[:, sources[start:stop]] & matrix[:, targets[start:stop]]).sum(axis=0)
+    reached = completed_by_quest[sources]
+    funnel = pd.DataFrame({
+        "prerequisite": [index.quest_ids[i] for i in sources],
+        "quest": [index.quest_ids[i] for i in targets],
+        "learners_reached": reached,
+        "learners_continued": continued,
+    })
+    funnel["drop_off"] = np.where(reached > 0, 1 - continued / np.maximum(reached, 1), 0.0)
+    funnel = funnel.sort_values(["drop_off", "learners_reached"], ascending=False, ignore_index=True)
+
+    xp = pd.Series([records[learner_id].total_xp for learner_id in learner_ids], name="total_xp", dtype="int64")
+    levels = (
+        pd.Series([records[learner_id].current_level for learner_id in learner_ids], name="level", dtype="int64")
+        .value_counts()
+        .sort_index()
+    )
+
+    return CohortReport(
+        learners=learners,
+        completion_rate=float(matrix.mean()) if matrix.size else 0.0,
+        zones=zone_table,
+        quests=quest_table,
+        funnel=funnel,
+        xp=xp,
+        levels=levels,
+    )
+
+
+def xp_histogram(xp, bins=20):
+    """Bucket total XP into ``bins`` equal ranges, indexed by each range's lower bound."""
+    counts, edges = np.histogram(xp, bins=bins)
+    return pd.Series(counts, index=pd.Index(edges[:-1].astype(int), name="total_xp"), name="learners")
@@ -0,0 +1,306 @@
+"""Headless JSON API over learner progress, for mobile and LMS integrations.
+
+    python api.py --port 8765
+
+Request bodies are batched, so one round trip can cover many quests and many
+learners:
+
+    GET  /health
+    GET  /curriculum    name, version, zones and quest count
+    POST /availability  {"queries": [{"learner": "a1", "quests": ["loops_basic", ...]}, ...]}
+                        (leave out "quests" to get the learner's available quests)
+    POST /progress      {"learners": ["a1", "b2"]}
+    POST /complete      {"completions": [{"learner": "a1", "quest": "loops_basic"}, ...]}
+
+Progress is read from and written to the same event log and store as the
+Streamlit app. Requests are handled on worker threads, so a large batch's
+database work never stalls the other connections.
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+import sys
+import threading
+import traceback
+from http import HTTPStatus
+from pathlib import Path
+
+from curriculum import CurriculumError, load_curriculum
+from event_log import COMPLETE, EventLog, load_learner
+from progress_store import BACKENDS, create_progress_store
+from quest_engine import COMPLETED, UNKNOWN
+
+DEFAULT_CURRICULUM = Path(__file__).parent / "curricula" / "python.json"
+
+# Largest accepted request body, and most learners or quests in one batch
+MAX_BODY_BYTES = 1 << 20
+MAX_BATCH = 1000
+
+
+class ApiError(Exception):
+    """Turned into a JSON error response with the given HTTP status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _batch(body, field):
+    items = body.get(field) if isinstance(body, dict) else None
+    if not isinstance(items, list):
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"Expected a JSON object with a {field!r} list")
+    if len(items) > MAX_BATCH:
+        raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"At most {MAX_BATCH} {field} per request")
+    return items
+
+
+def _learner_id(value):
+    if not isinstance(value, str) or not value:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Every learner id must be a non-empty string")
+    return value
+
+
+class ProgressApi:
+    """Request handlers; each one loads every learner it needs once."""
+
+    def __init__(self, curriculum, store, event_log, curriculum_id):
+        self.curriculum = curriculum
+        self.store = store
+        self.event_log = event_log
+        self.curriculum_id = curriculum_id
+        # Completions load learners and record events; two batches must not interleave
+        self._write_lock = threading.Lock()
+        self.routes = {
+            ("GET", "/health"): self.health,
+            ("GET", "/curriculum"): self.curriculum_info,
+            ("POST", "/availability"): self.availability,
+            ("POST", "/progress"): self.progress,
+            ("POST", "/complete"): self.complete,
+        }
+
+    def load_learner(self, learner_id):
+        return load_learner(
+            self.event_log,
+            self.store,
+            learner_id,
+            self.curriculum_id,
+            self.curriculum.index,
+            self.curriculum.starting_quests,
+        )
+
+    def dispatch(self, method, path, body):
+        handler = self.routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self.routes):
+                raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} is not supported on {path}")
+            raise ApiError(HTTPStatus.NOT_FOUND, f"No endpoint at {path}")
+        if method == "GET":
+            return handler()
+        try:
+            data = json.loads(body or b"null")
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Request body is not valid JSON") from None
+        return handler(data)
+
+    def health(self):
+        return {"status": "ok"}
+
+    def curriculum_info(self):
+        index = self.curriculum.index
+        return {
+            "name": self.curriculum.name,
+            "version": self.curriculum.version,
+            "zones": list(index.zones),
+            "quests": len(index),
+        }
+
+    def availability(self, body):
+        results = []
+        for query in _batch(body, "queries"):
+            if not isinstance(query, dict):
+                raise ApiError(HTTPStatus.BAD_REQUEST, "Every query must be a JSON object")
+            learner_id = _learner_id(query.get("learner"))
+            engine = self.load_learner(learner_id).engine
+            quests = query.get("quests")
+            if quests is None:
+                results.append({"learner": learner_id, "available": engine.available_quests()})
+                continue
+            if not isinstance(quests, list) or len(quests) > MAX_BATCH:
+                raise ApiError(HTTPStatus.BAD_REQUEST, f"'quests' must be a list of at most {MAX_BATCH} ids")
+            if not all(isinstance(quest_id, str) for quest_id in quests):
+                raise ApiError(HTTPStatus.BAD_REQUEST, "Every quest id must be a string")
+            positions = engine.index.positions
+            statuses = {
+                quest_id: engine.status(quest_id) if quest_id in positions else UNKNOWN for quest_id in quests
+            }
+            results.append({"learner": learner_id, "statuses": statuses})
+        return {"results": results}
+
+    def progress(self, body):
+        results = []
+        for learner_id in _batch(body, "learners"):
+            learner = self.load_learner(_learner_id(learner_id))
+            results.append({
+                "learner": learner_id,
+                "total_xp": learner.total_xp,
+                "level": learner.current_level,
+                "xp_to_next_level": learner.xp_to_next_level(),
+                "completed": learner.engine.completed_quests(),
+                "completion_rate": learner.engine.completion_rate(),
+                "zones": [zone._asdict() for zone in learner.zone_progress()],
+            })
+        return {"results": results}
+
+    def complete(self, body):
+        completions = _batch(body, "completions")
+        for completion in completions:
+            if not isinstance(completion, dict) or not isinstance(completion.get("quest"), str):
+                raise ApiError(HTTPStatus.BAD_REQUEST, 'Every completion needs a "learner" and a "quest"')
+            _learner_id(completion.get("learner"))
+
+        with self._write_lock:
+            return {"results": self._complete(completions)}
+
+    def _complete(self, completions):
+        learners = {}
+        results = []
+        for completion in completions:
+            learner_id = completion["learner"]
+            if learner_id not in learners:
+                learners[learner_id] = self.load_learner(learner_id)
+            learner = learners[learner_id]
+            result = learner.complete(completion["quest"])
+            if result.status == COMPLETED:
+                self.event_log.record(
+                    learner_id,
+                    self.curriculum_id,
+                    COMPLETE,
+                    result.quest_id,
+                    self.curriculum.index,
+                    self.curriculum.starting_quests,
+                )
+            results.append(dict(result._asdict(), learner=learner_id))
+        return results
+
+
+def _response(status, payload, keep_alive):
+    body = json.dumps(payload).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+async def _read_head(request_line, reader):
+    """Parse the request line and headers; malformed input becomes a 400."""
+    try:
+        method, target, version = request_line.decode("latin-1").split()
+        headers = {}
+        while True:
+            # readline raises ValueError for a line over the stream limit
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Malformed request") from None
+    if length < 0:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+    return method, target, version, headers, length
+
+
+async def handle_connection(api, reader, writer):
+    # Minimal HTTP/1.1: one JSON request at a time, with keep-alive
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            keep_alive = False
+            try:
+                method, target, version, headers, length = await _read_head(request_line, reader)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                if length > MAX_BODY_BYTES:
+                    keep_alive = False
+                    raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+                body = await reader.readexactly(length) if length else b""
+                # Same as asyncio.to_thread, which needs Python 3.9
+                dispatch = functools.partial(api.dispatch, method, target.split("?", 1)[0], body)
+                status, payload = HTTPStatus.OK, await asyncio.get_running_loop().run_in_executor(None, dispatch)
+            except ApiError as error:
+                status, payload = HTTPStatus(error.status), {"error": str(error)}
+            except (ConnectionError, asyncio.IncompleteReadError):
+                raise
+            except Exception:
+                traceback.print_exc()
+                status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error"}
+
+            writer.write(_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(api, host, port):
+    server = await asyncio.start_server(lambda r, w: handle_connection(api, r, w), host, port)
+    print(f"Serving {api.curriculum.name} on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--curriculum", default=str(DEFAULT_CURRICULUM), help="curriculum JSON or YAML file")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=os.environ.get("MAP_PROGRESS_BACKEND", "sqlite"))
+    parser.add_argument(
+        "--db",
+        default=os.environ.get("MAP_PROGRESS_DB", str(Path(__file__).parent / "progress.db")),
+        help="SQLite progress database",
+    )
+    parser.add_argument(
+        "--events",
+        default=os.environ.get("MAP_EVENT_LOG"),
+        help="completion event log database (in memory with the memory backend, else events.db)",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        curriculum = load_curriculum(args.curriculum)
+    except CurriculumError as error:
+        print(error, file=sys.stderr)
+        return 1
+
+    if args.backend == "sqlite":
+        store = create_progress_store(args.backend, path=args.db)
+    else:
+        store = create_progress_store(args.backend)
+    events = args.events or (":memory:" if args.backend == "memory" else str(Path(__file__).parent / "events.db"))
+    event_log = EventLog(events, store=store)
+    api = ProgressApi(curriculum, store, event_log, Path(args.curriculum).stem)
+    try:
+        asyncio.run(serve(api, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # The log's last batch still projects into the store
+        event_log.close()
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
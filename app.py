@@ -1,713 +1,622 @@
 import streamlit as st
-import networkx as nx
-from pyvis.network import Network
-import json
+import hmac
+import os
+import uuid
 from pathlib import Path
+from analytics import cohort_report, xp_histogram
+from catalog import CurriculumCatalog
+from event_log import COMPLETE, RESET, EventLog, load_learner
+from progress_store import create_progress_store
+from quest_engine import AVAILABLE, COMPLETED, LOCKED
+from live_map import live_map, live_map_event
+from metrics import MetricsSink, RerunMetrics
+from world_map import (
+    CLUSTER_PREFIX, MAP_OPTIONS_DATA, VIEW_ALL, VIEW_FRONTIER, VIEW_ZONE,
+    build_network, frontier_subgraph, network_payload, zone_subgraph
+)
 
 # Set page config
-st.set_page_config(page_title="Python Learning RPG Map", layout="wide")
-
-# Define the learning path data structure with sub-nodes
-PYTHON_TOPICS = {
-    # Beginner's Valley (Foundation Zone)
-    "basics_intro": {
-        "title": "Welcome to Python",
-        "description": "Your first steps into Python programming.",
-        "topics": ["Installation", "Python REPL", "First Program", "Text Editor Setup"],
-        "resources": ["Python.org Setup Guide", "VS Code Setup", "Hello World Tutorial"],
-        "difficulty": "Beginner",
-        "xp_reward": 100,
-        "estimated_hours": 2,
-        "color": "#4CAF50",
-        "zone": "Beginner's Valley"
-    },
-    "basics_syntax": {
-        "title": "Basic Syntax",
-        "description": "Learn the fundamental syntax of Python.",
-        "topics": ["Indentation", "Comments", "Print Statements", "Basic Operators"],
-        "resources": ["Python Style Guide", "Basic Syntax Tutorial"],
-        "difficulty": "Beginner",
-        "xp_reward": 150,
-        "estimated_hours": 3,
-        "color": "#4CAF50",
-        "zone": "Beginner's Valley"
-    },
-    "variables_basic": {
-        "title": "Variables I",
-        "description": "Understanding variables and basic data types.",
-        "topics": ["Numbers", "Strings", "Basic Operations", "Type Checking"],
-        "resources": ["Variable Tutorial", "Data Types Guide"],
-        "difficulty": "Beginner",
-        "xp_reward": 200,
-        "estimated_hours": 4,
-        "color": "#4CAF50",
-        "zone": "Beginner's Valley"
-    },
-    "strings_basic": {
-        "title": "Strings I",
-        "description": "Working with text in Python.",
-        "topics": ["String Creation", "Concatenation", "Basic Methods", "Formatting"],
-        "resources": ["String Basics", "String Operations"],
-        "difficulty": "Beginner",
-        "xp_reward": 200,
-        "estimated_hours": 4,
-        "color": "#4CAF50",
-        "zone": "Beginner's Valley"
-    },
-    "numbers_basic": {
-        "title": "Numbers & Math",
-        "description": "Mathematical operations and number types.",
-        "topics": ["Integers", "Floats", "Math Operations", "Math Module"],
-        "resources": ["Python Math Guide", "Number Operations"],
-        "difficulty": "Beginner",
-        "xp_reward": 200,
-        "estimated_hours": 4,
-        "color": "#4CAF50",
-        "zone": "Beginner's Valley"
-    },
-    "variables_advanced": {
-        "title": "Variables II",
-        "description": "Advanced variable concepts and type conversion.",
-        "topics": ["Type Conversion", "Complex Types", "Memory Management", "Scope"],
-        "resources": ["Advanced Variables", "Type System Deep Dive"],
-        "difficulty": "Beginner+",
-        "xp_reward": 250,
-        "estimated_hours": 5,
-        "color": "#81C784",
-        "zone": "Beginner's Valley"
-    },
-
-    # Control Flow Kingdom
-    "conditionals_basic": {
-        "title": "Conditionals I",
-        "description": "Making decisions in your code.",
-        "topics": ["if Statements", "else Clauses", "elif Statements", "Comparison Operators"],
-        "resources": ["Control Flow Basics", "Conditional Logic"],
-        "difficulty": "Beginner",
-        "xp_reward": 250,
-        "estimated_hours": 5,
-        "color": "#7E57C2",
-        "zone": "Control Flow Kingdom"
-    },
-    "loops_basic": {
-        "title": "Loops I",
-        "description": "Basic iteration and loops.",
-        "topics": ["for Loops", "while Loops", "Loop Control", "range() Function"],
-        "resources": ["Loop Basics", "Iteration Guide"],
-        "difficulty": "Beginner",
-        "xp_reward": 250,
-        "estimated_hours": 5,
-        "color": "#7E57C2",
-        "zone": "Control Flow Kingdom"
-    },
-    "conditionals_advanced": {
-        "title": "Conditionals II",
-        "description": "Advanced conditional logic and boolean operations.",
-        "topics": ["Boolean Logic", "Truth Tables", "Short-Circuit Evaluation", "Conditional Expressions"],
-        "resources": ["Advanced Conditionals", "Boolean Operations"],
-        "difficulty": "Beginner+",
-        "xp_reward": 300,
-        "estimated_hours": 6,
-        "color": "#9575CD",
-        "zone": "Control Flow Kingdom"
-    },
-    "loops_advanced": {
-        "title": "Loops II",
-        "description": "Advanced looping techniques.",
-        "topics": ["Nested Loops", "Loop Else", "Comprehensions Intro", "Iteration Patterns"],
-        "resources": ["Advanced Loops", "Loop Patterns"],
-        "difficulty": "Beginner+",
-        "xp_reward": 300,
-        "estimated_hours": 6,
-        "color": "#9575CD",
-        "zone": "Control Flow Kingdom"
-    },
-
-    # Data Structure Plains
-    "lists_basic": {
-        "title": "Lists I",
-        "description": "Introduction to Python lists.",
-        "topics": ["Creating Lists", "Indexing", "Basic Methods", "List Operations"],
-        "resources": ["List Tutorial", "List Operations Guide"],
-        "difficulty": "Beginner",
-        "xp_reward": 200,
-        "estimated_hours": 4,
-        "color": "#2196F3",
-        "zone": "Data Structure Plains"
-    },
-    "lists_methods": {
-        "title": "Lists II",
-        "description": "Working with list methods and operations.",
-        "topics": ["List Methods", "Sorting", "Copying", "Nested Lists"],
-        "resources": ["List Methods Guide", "List Operations Advanced"],
-        "difficulty": "Beginner+",
-        "xp_reward": 250,
-        "estimated_hours": 5,
-        "color": "#2196F3",
-        "zone": "Data Structure Plains"
-    },
-    "lists_advanced": {
-        "title": "Lists III",
-        "description": "Advanced list operations and comprehensions.",
-        "topics": ["List Comprehensions", "Slicing", "Advanced Methods", "Memory Efficiency"],
-        "resources": ["Advanced List Operations", "List Comprehension Guide"],
-        "difficulty": "Intermediate",
-        "xp_reward": 300,
-        "estimated_hours": 6,
-        "color": "#64B5F6",
-        "zone": "Data Structure Plains"
-    },
-    "tuples_basic": {
-        "title": "Tuples",
-        "description": "Understanding immutable sequences.",
-        "topics": ["Tuple Creation", "Tuple Methods", "Immutability", "Named Tuples"],
-        "resources": ["Tuple Guide", "Immutable Sequences"],
-        "difficulty": "Beginner+",
-        "xp_reward": 250,
-        "estimated_hours": 4,
-        "color": "#2196F3",
-        "zone": "Data Structure Plains"
-    },
-    "dict_basic": {
-        "title": "Dictionaries I",
-        "description": "Working with Python dictionaries.",
-        "topics": ["Dict Creation", "Key-Value Pairs", "Basic Methods", "Dict Operations"],
-        "resources": ["Dictionary Basics", "Dictionary Methods Guide"],
-        "difficulty": "Beginner+",
-        "xp_reward": 250,
-        "estimated_hours": 5,
-        "color": "#2196F3",
-        "zone": "Data Structure Plains"
-    },
-    "dict_advanced": {
-        "title": "Dictionaries II",
-        "description": "Advanced dictionary concepts and patterns.",
-        "topics": ["Dict Comprehensions", "DefaultDict", "Counter", "ChainMap"],
-        "resources": ["Advanced Dict Operations", "Collections Module"],
-        "difficulty": "Intermediate",
-        "xp_reward": 300,
-        "estimated_hours": 6,
-        "color": "#64B5F6",
-        "zone": "Data Structure Plains"
-    },
-    "sets_basic": {
-        "title": "Sets",
-        "description": "Understanding Python sets.",
-        "topics": ["Set Creation", "Set Operations", "Set Methods", "Frozen Sets"],
-        "resources": ["Set Tutorial", "Set Operations Guide"],
-        "difficulty": "Beginner+",
-        "xp_reward": 250,
-        "estimated_hours": 4,
-        "color": "#2196F3",
-        "zone": "Data Structure Plains"
-    },
-
-    # Function Fields
-    "functions_basic": {
-        "title": "Functions I",
-        "description": "Introduction to Python functions.",
-        "topics": ["Function Definition", "Parameters", "Return Values", "Docstrings"],
-        "resources": ["Function Tutorial", "Basic Functions Guide"],
-        "difficulty": "Beginner+",
-        "xp_reward": 250,
-        "estimated_hours": 5,
-        "color": "#FF9800",
-        "zone": "Function Fields"
-    },
-    "functions_arguments": {
-        "title": "Functions II",
-        "description": "Working with function arguments.",
-        "topics": ["Args", "Kwargs", "Default Values", "Keyword Arguments"],
-        "resources": ["Function Arguments", "Parameter Guide"],
-        "difficulty": "Intermediate",
-        "xp_reward": 300,
-        "estimated_hours": 6,
-        "color": "#FFB74D",
-        "zone": "Function Fields"
-    },
-    "functions_advanced": {
-        "title": "Functions III",
-        "description": "Advanced function concepts.",
-        "topics": ["Lambda Functions", "Map/Filter/Reduce", "Decorators", "Generators"],
-        "resources": ["Advanced Functions", "Functional Programming"],
-        "difficulty": "Intermediate",
-        "xp_reward": 350,
-        "estimated_hours": 8,
-        "color": "#FFB74D",
-        "zone": "Function Fields"
-    },
-    "recursion_basic": {
-        "title": "Recursion",
-        "description": "Understanding recursive functions.",
-        "topics": ["Recursive Patterns", "Base Cases", "Call Stack", "Optimization"],
-        "resources": ["Recursion Guide", "Recursive Problems"],
-        "difficulty": "Intermediate",
-        "xp_reward": 350,
-        "estimated_hours": 7,
-        "color": "#FFB74D",
-        "zone": "Function Fields"
-    },
-
-    # Error Handling Hills
-    "exceptions_basic": {
-        "title": "Exceptions I",
-        "description": "Basic error handling in Python.",
-        "topics": ["Try/Except", "Common Exceptions", "Raising Exceptions", "Finally Clause"],
-        "resources": ["Exception Handling", "Error Guide"],
-        "difficulty": "Beginner+",
-        "xp_reward": 250,
-        "estimated_hours": 5,
-        "color": "#F44336",
-        "zone": "Error Handling Hills"
-    },
-    "exceptions_advanced": {
-        "title": "Exceptions II",
-        "description": "Advanced exception handling.",
-        "topics": ["Custom Exceptions", "Exception Hierarchy", "Context Managers", "with Statement"],
-        "resources": ["Advanced Exceptions", "Context Management"],
-        "difficulty": "Intermediate",
-        "xp_reward": 300,
-        "estimated_hours": 6,
-        "color": "#EF5350",
-        "zone": "Error Handling Hills"
-    },
-    "debugging_basic": {
-        "title": "Debugging",
-        "description": "Tools and techniques for debugging Python code.",
-        "topics": ["Print Debugging", "Debugger Basics", "pdb", "Logging"],
-        "resources": ["Debugging Guide", "pdb Tutorial"],
-        "difficulty": "Intermediate",
-        "xp_reward": 300,
-        "estimated_hours": 6,
-        "color": "#EF5350",
-        "zone": "Error Handling Hills"
-    },
-
-    # Project Peaks (Side Quests)
-    "quest_calculator": {
-        "title": "Quest: Calculator",
-        "description": "Build a simple calculator application.",
-        "topics": ["Functions", "User Input", "Basic Operations", "Error Handling"],
-        "resources": ["Calculator Tutorial", "Project Guide"],
-        "difficulty": "Beginner",
-        "xp_reward": 300,
-        "estimated_hours": 4,
-        "color": "#9C27B0",
-        "zone": "Project Peaks"
-    },
-    "quest_todo": {
-        "title": "Quest: Todo List",
-        "description": "Create a command-line todo list.",
-        "topics": ["Lists", "File I/O", "User Input", "Data Persistence"],
-        "resources": ["Todo App Tutorial", "CLI App Guide"],
-        "difficulty": "Beginner+",
-        "xp_reward": 400,
-        "estimated_hours": 6,
-        "color": "#9C27B0",
-        "zone": "Project Peaks"
-    },
-    "quest_hangman": {
-        "title": "Quest: Hangman Game",
-        "description": "Create a text-based Hangman game.",
-        "topics": ["Strings", "Lists", "Random Module", "User Interface"],
-        "resources": ["Game Tutorial", "Text Games Guide"],
-        "difficulty": "Beginner+",
-        "xp_reward": 400,
-        "estimated_hours": 5,
-        "color": "#9C27B0",
-        "zone": "Project Peaks"
-    },
-    "quest_quiz": {
-        "title": "Quest: Quiz Game",
-        "description": "Build a multiple-choice quiz application.",
-        "topics": ["Dictionaries", "Random", "Score Tracking", "File I/O"],
-        "resources": ["Quiz App Tutorial", "JSON with Python"],
-        "difficulty": "Intermediate",
-        "xp_reward": 450,
-        "estimated_hours": 7,
-        "color": "#9C27B0",
-        "zone": "Project Peaks"
-    }
-}
+st.set_page_config(page_title="Learning RPG Map", layout="wide")
 
-# Initialize session state
-if 'graph' not in st.session_state:
-    st.session_state.graph = nx.DiGraph()
-    
-    # Add nodes and edges for the learning path
-    for topic_id, topic_data in PYTHON_TOPICS.items():
-        st.session_state.graph.add_node(topic_id, **topic_data)
-    
-    # Define the learning path connections with multiple paths
-    edges = [
-        # Beginner's Valley Core Path
-        ("basics_intro", "basics_syntax"),
-        ("basics_syntax", "variables_basic"),
-        ("variables_basic", "strings_basic"),
-        ("variables_basic", "numbers_basic"),
-        ("strings_basic", "variables_advanced"),
-        ("numbers_basic", "variables_advanced"),
-
-        # Control Flow Kingdom Connections
-        ("variables_basic", "conditionals_basic"),
-        ("conditionals_basic", "loops_basic"),
-        ("conditionals_basic", "conditionals_advanced"),
-        ("loops_basic", "loops_advanced"),
-        ("conditionals_advanced", "loops_advanced"),
-
-        # Data Structures Connections
-        ("variables_advanced", "lists_basic"),
-        ("loops_basic", "lists_basic"),
-        ("lists_basic", "lists_methods"),
-        ("lists_methods", "lists_advanced"),
-        ("lists_basic", "tuples_basic"),
-        ("lists_methods", "dict_basic"),
-        ("tuples_basic", "dict_basic"),
-        ("dict_basic", "dict_advanced"),
-        ("dict_basic", "sets_basic"),
-        
-        # Functions Connections
-        ("variables_advanced", "functions_basic"),
-        ("loops_basic", "functions_basic"),
-        ("functions_basic", "functions_arguments"),
-        ("functions_arguments", "functions_advanced"),
-        ("functions_arguments", "recursion_basic"),
-        ("loops_advanced", "recursion_basic"),
-
-        # Error Handling Connections
-        ("functions_basic", "exceptions_basic"),
-        ("exceptions_basic", "exceptions_advanced"),
-        ("exceptions_basic", "debugging_basic"),
-        
-        # Project Connections (Multiple Prerequisites)
-        ("variables_basic", "quest_calculator"),
-        ("functions_basic", "quest_calculator"),
-        ("lists_basic", "quest_todo"),
-        ("dict_basic", "quest_todo"),
-        ("strings_basic", "quest_hangman"),
-        ("lists_basic", "quest_hangman"),
-        ("dict_basic", "quest_quiz"),
-        ("exceptions_basic", "quest_quiz")
-    ]
-    st.session_state.graph.add_edges_from(edges)
-
-# Initialize session state for progress tracking
-if 'completed_quests' not in st.session_state:
-    st.session_state.completed_quests = {"basics_intro"}  # Start with first quest unlocked
-
-if 'current_level' not in st.session_state:
-    st.session_state.current_level = 1
-
-if 'total_xp' not in st.session_state:
-    st.session_state.total_xp = 0
-
-# Function to check if a quest is available
-def is_quest_available(quest_id, graph):
-    if quest_id in st.session_state.completed_quests:
-        return False  # Already completed
-    
-    # Get prerequisites (incoming edges)
-    predecessors = list(graph.predecessors(quest_id))
-    
-    # If no prerequisites, or all prerequisites are completed, quest is available
-    return not predecessors or all(pred in st.session_state.completed_quests for pred in predecessors)
-
-# Function to check if a quest is locked
-def is_quest_locked(quest_id, graph):
-    if quest_id in st.session_state.completed_quests:
-        return False
-    return not is_quest_available(quest_id, graph)
-
-# Function to get quest status color
-def get_quest_status_color(quest_id, base_color):
-    if quest_id in st.session_state.completed_quests:
-        return "#808080"  # Completed (gray)
-    elif is_quest_available(quest_id, st.session_state.graph):
-        return base_color  # Available (original color)
-    else:
-        return "#D3D3D3"  # Locked (light gray)
+# Directory of curriculum files; each file is one map, named (and its progress stored) by its file stem
+CURRICULA_DIR = Path(os.environ.get("MAP_CURRICULA_DIR", Path(__file__).parent / "curricula"))
+
+# Map shown when the page URL does not name one
+DEFAULT_CURRICULUM_ID = os.environ.get("MAP_DEFAULT_CURRICULUM", "python")
+
+# Progress backend ("sqlite" or "memory") and SQLite database location
+PROGRESS_BACKEND = os.environ.get("MAP_PROGRESS_BACKEND", "sqlite")
+PROGRESS_DB_PATH = os.environ.get("MAP_PROGRESS_DB", str(Path(__file__).parent / "progress.db"))
+
+# Completion/reset event log; kept in memory alongside the memory progress backend
+EVENT_LOG_PATH = os.environ.get(
+    "MAP_EVENT_LOG", ":memory:" if PROGRESS_BACKEND == "memory" else str(Path(__file__).parent / "events.db")
+)
+
+# Key that unlocks the Cohort Analytics view when passed as ?instructor=<key>; unset hides it
+INSTRUCTOR_KEY = os.environ.get("MAP_INSTRUCTOR_KEY")
+
+# Optional metrics file ("jsonl" appends one record per rerun, "prometheus" keeps running totals)
+METRICS_FILE = os.environ.get("MAP_METRICS_FILE")
+METRICS_FORMAT = os.environ.get("MAP_METRICS_FORMAT", "jsonl")
+
+# Open the metrics file once per process, when one is configured
+@st.cache_resource
+def get_metrics_sink():
+    return MetricsSink(METRICS_FILE, METRICS_FORMAT) if METRICS_FILE else None
+
+# Time this rerun's phases only when someone will look at the numbers
+metrics_sink = get_metrics_sink()
+rerun_metrics = RerunMetrics(
+    enabled=metrics_sink is not None or st.session_state.get("debug_panel", False),
+    session_id=st.session_state.get("learner_id"),
+)
+graph_setup_span = rerun_metrics.span("graph_setup")
+graph_setup_span.__enter__()
+
+# Artifacts every session of a curriculum version shares; shipped by the reload's compile
+# process or built on first use, and dropped with the version when the curriculum is reloaded
+def load_map_layout(hosted):
+    return hosted.artifact("map_layout")
+
+def load_search_index(hosted):
+    return hosted.artifact("search_index")
+
+def load_planner(hosted):
+    return hosted.artifact("planner")
+
+def load_recommender(hosted):
+    return hosted.artifact("recommender")
+
+# Load every curriculum once per process and watch their files; sessions share the read-only copies
+@st.cache_resource
+def get_catalog():
+    catalog = CurriculumCatalog(CURRICULA_DIR)
+    catalog.start()
+    return catalog
+
+catalog = get_catalog()
+if not len(catalog):
+    st.error(f"🚫 No curriculum could be loaded from {CURRICULA_DIR}")
+    for error in catalog.errors.values():
+        st.error(f"🚫 {error}")
+    st.stop()
+
+# Function to pick the map named in the page URL, or the default one
+def get_curriculum_id():
+    curriculum_id = st.query_params.get("map")
+    if curriculum_id not in catalog:
+        curriculum_id = DEFAULT_CURRICULUM_ID if DEFAULT_CURRICULUM_ID in catalog else catalog.ids()[0]
+    return curriculum_id
+
+if st.session_state.get("curriculum_id") not in catalog:
+    st.session_state.curriculum_id = get_curriculum_id()
+if len(catalog) > 1:
+    curriculum_names = {curriculum_id: catalog.get(curriculum_id).curriculum.name for curriculum_id in catalog.ids()}
+    st.sidebar.selectbox("🗺️ Map:", options=list(curriculum_names), format_func=curriculum_names.get, key="curriculum_id")
+
+# Key under which learner progress for this curriculum is stored
+CURRICULUM_ID = st.session_state.curriculum_id
+st.query_params["map"] = CURRICULUM_ID
+
+hosted = catalog.get(CURRICULUM_ID)
+if CURRICULUM_ID in catalog.errors:
+    st.sidebar.warning(f"⚠️ Still showing the last working version. {catalog.errors[CURRICULUM_ID]}")
+
+curriculum = hosted.curriculum
+QUESTS = curriculum.quests
+curriculum_version = hosted.key
+quest_index = curriculum.index
+
+# Quests every learner starts with
+STARTING_QUESTS = curriculum.starting_quests
+
+# Open the progress store once per process; its connection pool is shared by every session
+@st.cache_resource
+def get_progress_store():
+    if PROGRESS_BACKEND == "sqlite":
+        return create_progress_store(PROGRESS_BACKEND, path=PROGRESS_DB_PATH)
+    return create_progress_store(PROGRESS_BACKEND)
+
+# Open the event log once per process; its writer keeps the progress store in step with it
+@st.cache_resource
+def get_event_log(_store):
+    return EventLog(EVENT_LOG_PATH, store=_store)
+
+# Function to identify the learner across sessions; the id is kept in the page URL
+def get_learner_id():
+    learner_id = st.query_params.get("learner")
+    if not learner_id:
+        learner_id = uuid.uuid4().hex
+        st.query_params["learner"] = learner_id
+    return learner_id
+
+# Function to record a completion or reset in the event log; the writer batches it and
+# projects the learner's progress into the store from the log, not from this session
+def save_progress(kind, quest_id=None):
+    event_log.record(st.session_state.learner_id, CURRICULUM_ID, kind, quest_id, quest_index, STARTING_QUESTS)
+
+progress_store = get_progress_store()
+event_log = get_event_log(progress_store)
+
+if 'learner_id' not in st.session_state:
+    st.session_state.learner_id = get_learner_id()
+
+# Widget and map state that names zones or quests of one curriculum
+CURRICULUM_STATE_KEYS = (
+    "map_zone", "detail_zone", "detail_quest", "search_zone", "search_difficulty", "search_quest", "world_map_state",
+)
+
+# Initialize session state for progress tracking: the newest snapshot plus a short event tail
+if 'learner' not in st.session_state or st.session_state.get("learner_curriculum") != CURRICULUM_ID:
+    for state_key in CURRICULUM_STATE_KEYS:
+        st.session_state.pop(state_key, None)
+    st.session_state.learner = load_learner(
+        event_log, progress_store, st.session_state.learner_id, CURRICULUM_ID, quest_index, STARTING_QUESTS
+    )
+    st.session_state.learner_curriculum = CURRICULUM_ID
+elif st.session_state.learner.engine.index is not quest_index:
+    # The curriculum was reloaded; carry over completions that still exist
+    for state_key in CURRICULUM_STATE_KEYS:
+        st.session_state.pop(state_key, None)
+    st.session_state.learner = st.session_state.learner.with_index(quest_index)
+
+learner = st.session_state.learner
+quest_engine = learner.engine
+availability_checks_at_start = quest_engine.availability_checks
+graph_setup_span.__exit__(None, None, None)
 
 # Function to create quest details UI
 def show_quest_details(quest_id):
-    topic_data = PYTHON_TOPICS[quest_id]
+    quest = QUESTS[quest_id]
     
-    st.subheader(f"⚔️ {topic_data['title']}")
+    st.subheader(f"⚔️ {quest.title}")
     
     # Create columns for layout
     main_col, side_col = st.columns([2, 1])
     
     with main_col:
-        st.markdown(f"**Description:** {topic_data['description']}")
+        st.markdown(f"**Description:** {quest.description}")
         
         # Show prerequisites first
-        prerequisites = list(st.session_state.graph.predecessors(quest_id))
+        prerequisites = quest_index.prerequisites(quest_id)
         if prerequisites:
             st.markdown("#### 📋 Prerequisites")
             for prereq in prerequisites:
-                status = "✅" if prereq in st.session_state.completed_quests else "❌"
-                st.markdown(f"- {PYTHON_TOPICS[prereq]['title']} {status}")
+                status = "✅" if quest_engine.is_completed(prereq) else "❌"
+                st.markdown(f"- {QUESTS[prereq].title} {status}")
         
         st.markdown("#### 🎯 Quest Objectives")
-        for topic in topic_data['topics']:
+        for topic in quest.topics:
             st.markdown(f"- {topic}")
         
         st.markdown("#### 📚 Learning Resources")
-        for resource in topic_data['resources']:
+        for resource in quest.resources:
             st.markdown(f"- {resource}")
     
     with side_col:
         st.markdown("#### ℹ️ Quest Info")
-        st.markdown(f"**Zone:** {topic_data['zone']}")
-        st.markdown(f"**Difficulty:** {topic_data['difficulty']}")
-        st.markdown(f"**XP Reward:** {topic_data['xp_reward']} XP")
-        st.markdown(f"**Est. Time:** {topic_data['estimated_hours']} hours")
+        st.markdown(f"**Zone:** {quest.zone}")
+        st.markdown(f"**Difficulty:** {quest.difficulty}")
+        st.markdown(f"**XP Reward:** {quest.xp_reward} XP")
+        st.markdown(f"**Est. Time:** {quest.estimated_hours} hours")
         
         # Quest status and completion
-        if quest_id in st.session_state.completed_quests:
+        if quest_engine.is_completed(quest_id):
             st.success("✅ Quest Completed!")
-        elif is_quest_available(quest_id, st.session_state.graph):
+        elif quest_engine.is_available(quest_id):
             if st.button("Complete Quest", key=f"complete_{quest_id}"):
-                st.session_state.completed_quests.add(quest_id)
-                st.session_state.total_xp += topic_data['xp_reward']
+                result = learner.complete(quest_id)
                 
                 # Level up system
-                new_level = (st.session_state.total_xp // 1000) + 1
-                if new_level > st.session_state.current_level:
-                    st.session_state.current_level = new_level
+                if result.leveled_up:
                     st.balloons()
-                    st.success(f"🎉 Level Up! You are now level {new_level}!")
+                    st.success(f"🎉 Level Up! You are now level {result.level}!")
                 
+                save_progress(COMPLETE, quest_id)
                 st.success("Quest completed! 🎉")
                 st.rerun()
         else:
             st.error("🔒 Complete prerequisites first!")
 
+    # Everything still standing between the learner and a locked quest, in a workable order
+    if quest_engine.is_locked(quest_id):
+        plan = load_planner(hosted).plan(quest_id, quest_engine)
+        with st.expander(f"🗺️ Path to this quest ({len(plan.steps)} quests)", expanded=True):
+            st.markdown(
+                f"Finish these quests to unlock **{quest.title}**: "
+                f"about **{plan.estimated_hours:g} hours** for **{plan.xp_reward} XP**."
+            )
+            for step_number, step in enumerate(plan.steps, start=1):
+                status = "🔓" if quest_engine.is_available(step) else "🔒"
+                st.markdown(f"{step_number}. {QUESTS[step].title} {status}")
+
+# Maximum number of rendered maps kept in memory (least recently used are evicted)
+MAP_CACHE_SIZE = 256
+
+# Labels for the map view selector
+MAP_VIEW_LABELS = {
+    VIEW_ALL: "Whole map",
+    VIEW_ZONE: "One zone",
+    VIEW_FRONTIER: "Around my frontier",
+}
+
+# Function to render the world map nodes and edges; shared by every learner with the same progress and view
+@st.cache_data(max_entries=MAP_CACHE_SIZE, show_spinner=False)
+def render_map_payload(curriculum_version, progress_key, view, focus, _hosted, _engine):
+    rerun_metrics.count("map_renders")  # Only runs on a cache miss
+    layout = load_map_layout(_hosted)
+
+    # Large maps can be limited to one zone or to the area around the learner's frontier
+    if view == VIEW_ZONE:
+        visible = zone_subgraph(_engine, focus)
+    elif view == VIEW_FRONTIER:
+        visible = frontier_subgraph(_engine, focus)
+    else:
+        visible = None
+    net = build_network(_hosted.curriculum.quests, _engine, layout, visible)
+    return network_payload(net)
+
+# Maximum number of search results offered at once
+SEARCH_RESULT_LIMIT = 200
+
+# Labels for the search filters; None means "any"
+SEARCH_STATUS_LABELS = {
+    None: "Any status",
+    AVAILABLE: "🔓 Available",
+    COMPLETED: "✅ Completed",
+    LOCKED: "🔒 Locked",
+}
+
+# Number of prerequisite edges listed in the cohort funnel
+FUNNEL_ROWS = 20
+
+# Function to aggregate every learner's progress; recomputed only when some learner's progress changed.
+# cache_data hands each session its own copy of the DataFrames
+@st.cache_data(max_entries=4, show_spinner="Crunching cohort progress...")
+def load_cohort_report(curriculum_version, progress_revision, _store, _hosted):
+    curriculum = _hosted.curriculum
+    return cohort_report(curriculum.index, curriculum.quests, _store.load_all(_hosted.curriculum_id))
+
+# Function to label a quest in a list with its status
+def quest_label(quest_id):
+    if quest_engine.is_completed(quest_id):
+        icon = "✅"
+    elif quest_engine.is_locked(quest_id):
+        icon = "🔒"
+    else:
+        icon = "🔓"
+    return f"{QUESTS[quest_id].title} {icon}"
+
 # Title and description
-st.title("🐍 Python Learning RPG Map")
-st.markdown("""
-This interactive map shows your journey to Python mastery. Each node represents a quest or challenge to complete.
+st.title(f"🗺️ {curriculum.name}")
 
-### Map Legend
-- 🟢 **Green nodes**: Beginner quests (Beginner's Valley)
-- 🔵 **Blue nodes**: Data structure quests (Data Structure Plains)
-- 🟠 **Orange nodes**: Function quests (Function Fields)
-- 🟣 **Purple nodes**: Side projects (Project Peaks)
+# Each zone is shown in the colour of its first quest
+zone_colors = {}
+for quest in QUESTS.values():
+    zone_colors.setdefault(quest.zone, quest.color)
+zone_legend = "\n".join(
+    f'- <span style="color:{color}">⬢</span> **{zone}**' for zone, color in zone_colors.items()
+)
+st.markdown(f"""
+This interactive map shows your learning journey. Each node represents a quest or challenge to complete.
 
+### Map Legend
+{zone_legend}
+""", unsafe_allow_html=True)
+st.markdown("""
 ### Quest Status
 - ⬜ **Gray nodes**: Locked quests (prerequisites not met)
 - 🔳 **Colored nodes**: Available quests
 - ⬛ **Dark gray nodes**: Completed quests
 """)
 
-# Create tabs for different views
-tab1, tab2, tab3 = st.tabs(["World Map", "Quest Details", "Adventure Progress"])
-
-with tab1:
-    # Create and configure the network
-    net = Network(height="750px", width="100%", bgcolor="#ffffff", font_color="black")
-    net.toggle_physics(False)
-    
-    # Configure network options for better visualization
-    net.set_options("""
-    {
-        "nodes": {
-            "shape": "hexagon",
-            "shadow": true,
-            "font": {
-                "size": 14,
-                "face": "Roboto"
-            },
-            "scaling": {
-                "label": {
-                    "enabled": true,
-                    "min": 8,
-                    "max": 20
-                }
-            }
-        },
-        "edges": {
-            "color": {
-                "inherit": false
-            },
-            "arrows": {
-                "to": {
-                    "enabled": true,
-                    "scaleFactor": 0.5
-                }
-            },
-            "smooth": {
-                "type": "continuous",
-                "roundness": 0.5
-            }
-        },
-        "layout": {
-            "hierarchical": {
-                "enabled": true,
-                "direction": "UD",
-                "sortMethod": "directed",
-                "nodeSpacing": 150,
-                "levelSeparation": 100,
-                "treeSpacing": 200
-            }
-        },
-        "interaction": {
-            "dragNodes": true,
-            "dragView": true,
-            "zoomView": true,
-            "hover": true,
-            "multiselect": false,
-            "navigationButtons": true
-        },
-        "physics": {
-            "enabled": false,
-            "hierarchicalRepulsion": {
-                "centralGravity": 0.0,
-                "springLength": 100,
-                "springConstant": 0.01,
-                "nodeDistance": 120
-            },
-            "minVelocity": 0.75
-        }
-    }
-    """)
-
-    # Add nodes and edges with improved visibility
-    for node_id in st.session_state.graph.nodes():
-        node_data = st.session_state.graph.nodes[node_id]
-        
-        # Determine node status
-        is_completed = node_id in st.session_state.completed_quests
-        is_available = is_quest_available(node_id, st.session_state.graph)
-        
-        # Create status indicator
-        status_icon = "✅ " if is_completed else "🔓 " if is_available else "🔒 "
-        
-        # Create tooltip with more info
-        tooltip = f"""
-        {status_icon}{node_data['title']}
-        
-        Difficulty: {node_data['difficulty']}
-        XP Reward: {node_data['xp_reward']}
-        Time: ~{node_data['estimated_hours']} hours
-        
-        Click to view in Quest Details tab!
-        """
-        
-        # Add node with modified appearance
-        net.add_node(
-            node_id,
-            label=f"{node_data['title']}",
-            title=tooltip,
-            color=get_quest_status_color(node_id, node_data['color']),
-            borderWidth=3 if is_available else 1,
-            borderWidthSelected=4,
-            size=30 if is_completed or is_available else 25
+# Function to show the world map view
+def show_world_map():
+    # Choose how much of the map to show
+    view_col, focus_col = st.columns([1, 2])
+    with view_col:
+        map_view = st.radio(
+            "Map View:",
+            options=[VIEW_ALL, VIEW_ZONE, VIEW_FRONTIER],
+            format_func=MAP_VIEW_LABELS.get,
+            horizontal=True,
+            key="map_view",
         )
+    with focus_col:
+        if map_view == VIEW_ZONE:
+            map_focus = st.selectbox("Zone:", options=quest_index.zones, key="map_zone")
+        elif map_view == VIEW_FRONTIER:
+            map_focus = st.slider("Steps around your available quests:", min_value=1, max_value=5, value=2, key="map_hops")
+        else:
+            map_focus = None
 
-    # Add edges with improved visibility
-    for edge in st.session_state.graph.edges():
-        source, target = edge
-        is_active = (source in st.session_state.completed_quests and 
-                    is_quest_available(target, st.session_state.graph))
-        
-        net.add_edge(
-            source, 
-            target, 
-            color="#2E7D32" if is_active else "#D3D3D3",
-            width=2 if is_active else 1,
-            smooth={'type': 'curvedCW', 'roundness': 0.2}
+    # Render (or reuse) the map for the current progress
+    progress_key = quest_engine.progress_key()
+    with rerun_metrics.span("map_build"):
+        map_payload = render_map_payload(
+            curriculum_version,
+            progress_key,
+            map_view,
+            map_focus,
+            hosted,
+            quest_engine,
         )
 
-    # Save and display the network
-    html_path = "network.html"
-    net.save_graph(html_path)
-    with open(html_path, 'r', encoding='utf-8') as f:
-        html_content = f.read()
-    st.components.v1.html(html_content, height=750)
+    # The browser keeps its network and only receives changes, unless the set of
+    # visible quests changed (the frontier view moves with progress)
+    map_base = f"{curriculum_version}:{map_view}:{map_focus}"
+    if map_view == VIEW_FRONTIER:
+        map_base += f":{progress_key}"
+    with rerun_metrics.span("map_send"):
+        live_map(
+            map_payload, map_base, quest_engine, MAP_OPTIONS_DATA,
+            key="world_map", event=map_event, metrics=rerun_metrics,
+        )
 
-with tab2:
+# Function to show the quest browser
+def show_quest_browser():
     # Quest selection and details
     st.header("Quest Details")
-    
+
+    # Search every quest by its text, optionally narrowed by zone, difficulty and status
+    search_index = load_search_index(hosted)
+    query = st.text_input("🔍 Search quests:", key="quest_search", placeholder="e.g. list comprehension")
+    zone_col, difficulty_col, status_col = st.columns(3)
+    with zone_col:
+        search_zone = st.selectbox(
+            "Zone:",
+            options=[None, *quest_index.zones],
+            format_func=lambda x: "Any zone" if x is None else x,
+            key="search_zone",
+        )
+    with difficulty_col:
+        search_difficulty = st.selectbox(
+            "Difficulty:",
+            options=[None, *search_index.difficulties],
+            format_func=lambda x: "Any difficulty" if x is None else x,
+            key="search_difficulty",
+        )
+    with status_col:
+        search_status = st.selectbox(
+            "Status:",
+            options=list(SEARCH_STATUS_LABELS),
+            format_func=SEARCH_STATUS_LABELS.get,
+            key="search_status",
+        )
+
+    if query.strip() or search_zone or search_difficulty or search_status:
+        results = search_index.search(
+            query,
+            zone=search_zone,
+            difficulty=search_difficulty,
+            status=search_status,
+            engine=quest_engine,
+        )
+        if not results:
+            st.info("No quests match your search.")
+            return
+
+        shown = results[:SEARCH_RESULT_LIMIT]
+        if len(results) > len(shown):
+            st.caption(f"Showing the best {len(shown)} of {len(results)} matching quests")
+        else:
+            st.caption(f"{len(results)} matching quests")
+        if st.session_state.get("search_quest") not in shown:
+            st.session_state.pop("search_quest", None)
+        selected_topic = st.selectbox("Select Quest:", options=shown, format_func=quest_label, key="search_quest")
+        show_quest_details(selected_topic)
+        return
+
     # Filter by zone
     selected_zone = st.selectbox(
         "Select Zone:",
-        options=sorted(set(topic['zone'] for topic in PYTHON_TOPICS.values()))
+        options=quest_index.zones,
+        key="detail_zone"
     )
     
     # Filter topics by selected zone and availability
-    zone_topics = {k: v for k, v in PYTHON_TOPICS.items() 
-                  if v['zone'] == selected_zone and 
-                  (k in st.session_state.completed_quests or is_quest_available(k, st.session_state.graph))}
+    zone_topics = {k: QUESTS[k] for k in quest_engine.unlocked_quests(selected_zone)}
+
+    # A locked quest opened from the map stays listed, so its path can be shown
+    picked = st.session_state.get("detail_quest")
+    if picked in quest_index.positions and picked not in zone_topics and QUESTS[picked].zone == selected_zone:
+        zone_topics[picked] = QUESTS[picked]
     
     if not zone_topics:
         st.warning("No quests available in this zone yet! Complete prerequisites to unlock more quests.")
     else:
+        # Forget a quest picked on the map once it is no longer in this zone's list
+        if st.session_state.get("detail_quest") not in zone_topics:
+            st.session_state.pop("detail_quest", None)
+
         selected_topic = st.selectbox(
             "Select Quest:",
             options=list(zone_topics.keys()),
-            format_func=lambda x: f"{zone_topics[x]['title']} {'✅' if x in st.session_state.completed_quests else '🔓'}"
+            format_func=quest_label,
+            key="detail_quest"
         )
         
         # Show quest details
         show_quest_details(selected_topic)
 
-with tab3:
+# Function to show the adventure progress overview
+def show_adventure_progress():
     # Adventure Progress Overview
     st.header("Your Adventure Progress")
     
     # Player Stats
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Current Level", st.session_state.current_level)
+        st.metric("Current Level", learner.current_level)
     with col2:
-        st.metric("Total XP", st.session_state.total_xp)
+        st.metric("Total XP", learner.total_xp)
     with col3:
-        completion_rate = len(st.session_state.completed_quests) / len(PYTHON_TOPICS) * 100
+        completion_rate = quest_engine.completion_rate() * 100
         st.metric("Completion Rate", f"{completion_rate:.1f}%")
     
+    # The best next steps on the learner's frontier
+    recommendations = load_recommender(hosted).recommend(quest_engine)
+    if recommendations:
+        st.subheader("🧭 Recommended Next Quests")
+        for recommendation in recommendations:
+            quest = QUESTS[recommendation.quest_id]
+            reasons = [f"{recommendation.xp_per_hour:.0f} XP/hour"]
+            if recommendation.unlocks:
+                reasons.append(f"unlocks {recommendation.unlocks}")
+            if recommendation.closer:
+                reasons.append(f"brings {recommendation.closer} closer")
+            reasons.append(f"{recommendation.downstream} quests build on it")
+            st.markdown(f"**{quest.title}** · {quest.zone}")
+            st.caption(", ".join(reasons))
+
     # Progress bars for each zone
     st.subheader("Zone Progress")
     
-    for zone in sorted(set(topic['zone'] for topic in PYTHON_TOPICS.values())):
-        zone_quests = {k: v for k, v in PYTHON_TOPICS.items() if v['zone'] == zone}
-        completed_in_zone = len([q for q in zone_quests if q in st.session_state.completed_quests])
-        total_in_zone = len(zone_quests)
-        
-        progress = completed_in_zone / total_in_zone
-        st.markdown(f"**{zone}** ({completed_in_zone}/{total_in_zone} quests)")
-        st.progress(progress)
+    for zone in learner.zone_progress():
+        progress = zone.completed / zone.total
+        st.markdown(f"**{zone.zone}** ({zone.completed}/{zone.total} quests)")
+        st.progress(float(progress))
         
         # Show available quests in zone
-        available_quests = [q for q in zone_quests if is_quest_available(q, st.session_state.graph)]
-        if available_quests:
+        if zone.available:
             st.markdown("Available Quests:")
-            for quest in available_quests:
-                st.markdown(f"- {PYTHON_TOPICS[quest]['title']}")
+            for quest in zone.available:
+                st.markdown(f"- {QUESTS[quest].title}")
         st.markdown("---")
 
+# Function to show cohort statistics for instructors
+def show_cohort_analytics():
+    st.header("Cohort Analytics")
+
+    report = load_cohort_report(curriculum_version, progress_store.revision(CURRICULUM_ID), progress_store, hosted)
+    if not report.learners:
+        st.info("No learner progress has been saved yet.")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Learners", report.learners)
+    with col2:
+        st.metric("Average Completion", f"{report.completion_rate * 100:.1f}%")
+    with col3:
+        st.metric("Median XP", int(report.xp.median()))
+
+    st.subheader("Completion by Zone")
+    st.bar_chart(report.zones.set_index("zone")["completion_rate"])
+    st.dataframe(report.zones, hide_index=True, use_container_width=True)
+
+    st.subheader("Completion by Quest")
+    st.dataframe(report.quests.sort_values("completion_rate"), hide_index=True, use_container_width=True)
+
+    st.subheader("Funnel Drop-off")
+    st.caption("Learners who finished a prerequisite but have not gone on to the quest it unlocks")
+    st.dataframe(report.funnel.head(FUNNEL_ROWS), hide_index=True, use_container_width=True)
+
+    st.subheader("XP and Levels")
+    xp_col, level_col = st.columns(2)
+    with xp_col:
+        st.bar_chart(xp_histogram(report.xp))
+    with level_col:
+        st.bar_chart(report.levels)
+
+# Views of the app and the metrics span each one is timed under; only the selected view runs
+VIEWS = {
+    "World Map": ("world_map", show_world_map),
+    "Quest Details": ("quest_details", show_quest_browser),
+    "Adventure Progress": ("adventure_progress", show_adventure_progress),
+    "Cohort Analytics": ("cohort_analytics", show_cohort_analytics),
+}
+
+# Cohort Analytics shows every learner's progress, so only instructors see it
+def is_instructor():
+    key = st.query_params.get("instructor")
+    return bool(INSTRUCTOR_KEY and key) and hmac.compare_digest(key.encode(), INSTRUCTOR_KEY.encode())
+
+if not is_instructor():
+    VIEWS.pop("Cohort Analytics")
+    if st.session_state.get("active_view") not in VIEWS:
+        st.session_state.pop("active_view", None)
+
+# Streamlit forgets the value of a widget that was not drawn in the previous rerun,
+# so the filters of hidden views are stored again to survive switching views
+for widget_key in (
+    "map_view", "map_zone", "map_hops", "detail_zone", "detail_quest",
+    "quest_search", "search_zone", "search_difficulty", "search_status", "search_quest",
+):
+    if widget_key in st.session_state:
+        st.session_state[widget_key] = st.session_state[widget_key]
+
+# A click on the map opens the quest in Quest Details, or expands a collapsed zone
+map_event = live_map_event("world_map")
+if map_event and map_event.get("event") == "select":
+    clicked = map_event["quest_id"]
+    if clicked.startswith(CLUSTER_PREFIX):
+        st.session_state.map_view = VIEW_ZONE
+        st.session_state.map_zone = clicked[len(CLUSTER_PREFIX):]
+    elif clicked in quest_index.positions:
+        # Locked quests open too, showing the path that unlocks them
+        st.session_state.detail_zone = QUESTS[clicked].zone
+        st.session_state.detail_quest = clicked
+        st.session_state.active_view = "Quest Details"
+        # Leave search mode so the zone browser shows the clicked quest
+        st.session_state.quest_search = ""
+        for filter_key in ("search_zone", "search_difficulty", "search_status"):
+            st.session_state[filter_key] = None
+        icon = "🔒" if quest_engine.is_locked(clicked) else "⚔️"
+        st.toast(f"{icon} {QUESTS[clicked].title} opened in Quest Details")
+
+active_view = st.radio(
+    "View:",
+    options=list(VIEWS),
+    horizontal=True,
+    key="active_view",
+    label_visibility="collapsed",
+)
+
+span_name, show_view = VIEWS[active_view]
+if active_view != "World Map":
+    # The browser drops the hidden map, so the next visit starts from a full payload
+    st.session_state.pop("world_map_state", None)
+with rerun_metrics.span(span_name):
+    show_view()
+
 # Sidebar stats and controls
-with st.sidebar:
+with st.sidebar, rerun_metrics.span("sidebar"):
     st.header("🎮 Adventure Controls")
     
     # Quick stats
     st.markdown("### 📈 Quick Stats")
-    st.markdown(f"**Quests Completed:** {len(st.session_state.completed_quests)}/{len(PYTHON_TOPICS)}")
-    st.markdown(f"**Current Level:** {st.session_state.current_level}")
-    st.markdown(f"**Total XP:** {st.session_state.total_xp}")
+    st.markdown(f"**Quests Completed:** {quest_engine.completed_count()}/{len(quest_index)}")
+    st.markdown(f"**Current Level:** {learner.current_level}")
+    st.markdown(f"**Total XP:** {learner.total_xp}")
     
     # XP Progress bar
-    next_level_xp = (st.session_state.current_level * 1000)
-    current_level_progress = (st.session_state.total_xp % 1000) / 1000
-    st.markdown(f"**Progress to Level {st.session_state.current_level + 1}**")
-    st.progress(current_level_progress)
-    st.text(f"XP to next level: {next_level_xp - (st.session_state.total_xp % 1000)}")
+    st.markdown(f"**Progress to Level {learner.current_level + 1}**")
+    st.progress(learner.level_progress())
+    st.text(f"XP to next level: {learner.xp_to_next_level()}")
     
     st.markdown("---")
     
     # Reset button (for testing)
     if st.button("🔄 Reset Progress"):
-        st.session_state.completed_quests = {"basics_intro"}
-        st.session_state.current_level = 1
-        st.session_state.total_xp = 0
-        st.rerun() 
\ No newline at end of file
+        learner.reset(STARTING_QUESTS)
+        save_progress(RESET)
+        st.rerun() 
+
+    st.markdown("---")
+    show_debug_panel = st.checkbox("🛠️ Debug panel", key="debug_panel")
+
+# Finish this rerun's metrics
+if rerun_metrics.enabled:
+    rerun_metrics.count("availability_checks", quest_engine.availability_checks - availability_checks_at_start)
+    if metrics_sink is not None:
+        metrics_sink.record(rerun_metrics)
+    if show_debug_panel:
+        with st.sidebar:
+            st.markdown("### 🛠️ Rerun Timings")
+            for name, seconds in rerun_metrics.spans.items():
+                st.text(f"{name:<20} {seconds * 1000:8.2f} ms")
+            st.markdown("### 🔢 Counters")
+            for name, value in rerun_metrics.counters.items():
+                st.text(f"{name:<20} {value:>11,}")
@@ -0,0 +1 @@
+"""Benchmarks for the learning map; run with ``python -m benchmarks.run``."""
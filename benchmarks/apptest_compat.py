@@ -0,0 +1,94 @@
+"""Workarounds for running app.py under streamlit.testing.v1.AppTest (streamlit 1.31).
+
+AppTest runs the script without adding its directory to ``sys.path``, and on a
+rerun a selectbox or radio with a ``format_func`` looks up its value among the
+formatted labels, so ``.index`` raises ``ValueError``. The patched property
+serializes the value with the widget's own serializer instead, falling back
+to the default index.
+
+AppTest also keeps button triggers set after a run so the element tree can
+show them, which turns a click followed by ``st.rerun()`` into an endless
+loop of clicks; triggers are now reset when a run stops for a rerun.
+
+Each ``AppTest.run`` also installs a mock ``Runtime`` and removes it when it
+finishes, which breaks any other session running at the same time, and
+gives every session its own script cache, so sessions compile app.py
+concurrently (which CPython 3.11's AST constructor does not survive).
+``share_runtime`` keeps the first mock installed for every session and shares
+one script cache between them, as a server does.
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_patched = False
+
+
+def patch_apptest():
+    global _patched
+    if _patched:
+        return
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+
+    from streamlit.runtime.scriptrunner import ScriptRunnerEvent
+    from streamlit.testing.v1 import element_tree
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    for widget_class in (element_tree.Selectbox, element_tree.Radio):
+        original = widget_class.index.fget
+
+        def index(self, original=original):
+            try:
+                return original(self)
+            except ValueError:
+                pass
+            # Serialize the value the way the script registered the widget, labels aside
+            metadata = self.root.session_state._state._new_widget_state.widget_metadata.get(self.id)
+            if metadata is None:
+                return self.proto.default
+            return metadata.serializer(self.value)
+
+        widget_class.index = property(index)
+
+    on_script_finished = LocalScriptRunner._on_script_finished
+
+    def _on_script_finished(self, ctx, event, premature_stop):
+        if event == ScriptRunnerEvent.SCRIPT_STOPPED_FOR_RERUN:
+            self._session_state._state._reset_triggers()
+        on_script_finished(self, ctx, event, premature_stop)
+
+    LocalScriptRunner._on_script_finished = _on_script_finished
+    _patched = True
+
+
+class _SharedRuntime:
+    """Stands in for ``Runtime`` inside app_test; ignores the per-run install and teardown."""
+
+    def __init__(self, runtime_class):
+        object.__setattr__(self, "_runtime_class", runtime_class)
+
+    def __getattr__(self, name):
+        return getattr(self._runtime_class, name)
+
+    def __dir__(self):
+        return dir(self._runtime_class)
+
+    def __setattr__(self, name, value):
+        if name == "_instance" and (value is None or self._runtime_class._instance is not None):
+            return
+        setattr(self._runtime_class, name, value)
+
+
+def share_runtime():
+    """Let several AppTest sessions run at once in one process, as a server's sessions do."""
+    patch_apptest()
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    if not isinstance(app_test.Runtime, _SharedRuntime):
+        app_test.Runtime = _SharedRuntime(app_test.Runtime)
+        script_cache = ScriptCache()
+        local_script_runner.ScriptCache = lambda: script_cache
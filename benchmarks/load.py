@@ -0,0 +1,270 @@
+"""Drive many simulated learners through app.py at once and report rerun latency.
+
+    python -m benchmarks.load
+    python -m benchmarks.load --sizes 100 3000 --sessions 1 8 32 --steps 40
+    python -m benchmarks.load --curriculum curricula/python.json --think 0.5
+
+Every (curriculum size, session count) pair runs in a fresh interpreter, so
+caches and memory start from the same point. There, one warm-up run loads
+the app, then each simulated session runs in its own thread against the same
+process-wide caches, the way a Streamlit server runs its sessions. A session
+opens the map, switches to a zone view and between zones, opens an available
+quest in Quest Details, completes it, returns to the map, and now and then
+resets its progress. Every step is one timed rerun.
+
+Reported per pair: p50/p95/p99 rerun latency, reruns per second across all
+sessions, and resident memory added per session. No browser is involved;
+sessions use Streamlit's AppTest with the workarounds in
+``benchmarks.apptest_compat``.
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+APP_PATH = ROOT / "app.py"
+
+DEFAULT_SIZES = (100, 1000)
+DEFAULT_SESSIONS = (1, 4, 16)
+
+# Curriculum id the harness serves its curriculum under
+LOAD_CURRICULUM_ID = "load"
+
+# Label of the sidebar reset button
+RESET_LABEL = "🔄 Reset Progress"
+
+
+def resident_bytes():
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+
+        # Peak rather than current, but the best the platform offers
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+class SimulatedLearner:
+    """One session following the map -> zone -> quest -> complete -> map loop."""
+
+    def __init__(self, number, steps, reset_every, think, seed, timeout):
+        from streamlit.testing.v1 import AppTest
+
+        self.rng = random.Random(seed * 10007 + number)
+        self.steps = steps
+        self.reset_every = reset_every
+        self.think = think
+        self.at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+        self.latencies = {}
+        self.error = None
+        self.completions = 0
+
+    def timed(self, step, widget):
+        start = time.perf_counter()
+        widget.run()
+        self.latencies.setdefault(step, []).append(time.perf_counter() - start)
+        if self.at.exception:
+            raise RuntimeError(self.at.exception[0].message)
+        if self.think:
+            time.sleep(self.rng.uniform(0, 2 * self.think))
+
+    def run(self):
+        try:
+            self.timed("open", self.at)
+            taken = 1
+            while taken < self.steps:
+                for step in self.loop():
+                    step()
+                    taken += 1
+                    if taken >= self.steps:
+                        break
+        except Exception as error:  # Reported, not raised: one failing session must not hide the others
+            self.error = f"{type(error).__name__}: {error}"
+
+    def loop(self):
+        at = self.at
+        yield lambda: self.timed("zone_view", at.radio(key="map_view").set_value("zone"))
+        yield lambda: self.timed("switch_zone", at.selectbox(key="map_zone").set_value(self.pick_zone()))
+        yield lambda: self.timed("whole_map", at.radio(key="map_view").set_value("all"))
+
+        quest_id = self.pick_available_quest()
+        if quest_id is None or (self.completions and self.completions % self.reset_every == 0):
+            yield lambda: self.timed("reset", next(b for b in at.button if b.label == RESET_LABEL).click())
+            self.completions = 0
+            return
+
+        index = at.session_state.learner.engine.index
+        zone = index.zones[index.zone_codes[index.positions[quest_id]]]
+        yield lambda: self.timed("quest_details", at.radio(key="active_view").set_value("Quest Details"))
+        yield lambda: self.timed("pick_zone", at.selectbox(key="detail_zone").set_value(zone))
+        yield lambda: self.timed("pick_quest", at.selectbox(key="detail_quest").set_value(quest_id))
+        yield lambda: self.timed("complete", next(b for b in at.button if b.key == f"complete_{quest_id}").click())
+        self.completions += 1
+        yield lambda: self.timed("back_to_map", at.radio(key="active_view").set_value("World Map"))
+
+    def pick_zone(self):
+        return self.rng.choice(self.at.selectbox(key="map_zone").options)
+
+    def pick_available_quest(self):
+        available = self.at.session_state.learner.engine.available_quests()
+        return self.rng.choice(available) if available else None
+
+
+def percentiles(latencies):
+    import numpy as np
+
+    if not latencies:
+        return {}
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {"p50_s": float(p50), "p95_s": float(p95), "p99_s": float(p99)}
+
+
+def run_worker(config):
+    """Run one (size, sessions) measurement in this process and return its results."""
+    from benchmarks.apptest_compat import share_runtime
+    from streamlit.testing.v1 import AppTest
+
+    share_runtime()
+    warmup = AppTest.from_file(str(APP_PATH), default_timeout=config["timeout"])
+    start = time.perf_counter()
+    warmup.run()
+    warmup_s = time.perf_counter() - start
+    if warmup.exception:
+        raise RuntimeError(warmup.exception[0].message)
+    quests = len(warmup.session_state.learner.engine.index)
+    del warmup
+
+    before = resident_bytes()
+    learners = [
+        SimulatedLearner(n, config["steps"], config["reset_every"], config["think"], config["seed"], config["timeout"])
+        for n in range(config["sessions"])
+    ]
+    threads = [threading.Thread(target=learner.run, name=f"learner-{n}") for n, learner in enumerate(learners)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_s = time.perf_counter() - start
+    after = resident_bytes()
+
+    all_latencies = [s for learner in learners for step in learner.latencies.values() for s in step]
+    by_step = {}
+    for learner in learners:
+        for step, timings in learner.latencies.items():
+            by_step.setdefault(step, []).extend(timings)
+    return {
+        "nodes": quests,
+        "sessions": config["sessions"],
+        "reruns": len(all_latencies),
+        "errors": [learner.error for learner in learners if learner.error],
+        "warmup_s": warmup_s,
+        "wall_s": wall_s,
+        "throughput_per_s": len(all_latencies) / wall_s if wall_s else 0.0,
+        "rss_before_bytes": before,
+        "rss_per_session_bytes": (after - before) / config["sessions"],
+        **percentiles(all_latencies),
+        "steps": {step: dict(percentiles(timings), count=len(timings)) for step, timings in by_step.items()},
+    }
+
+
+def measure(curriculum_file, sessions, args):
+    config = {
+        "sessions": sessions,
+        "steps": args.steps,
+        "reset_every": args.reset_every,
+        "think": args.think,
+        "seed": args.seed,
+        "timeout": args.timeout,
+    }
+    env = dict(
+        os.environ,
+        MAP_CURRICULA_DIR=str(curriculum_file.parent),
+        MAP_DEFAULT_CURRICULUM=LOAD_CURRICULUM_ID,
+        MAP_PROGRESS_BACKEND="memory",
+    )
+    env.pop("MAP_EVENT_LOG", None)
+    env.pop("MAP_METRICS_FILE", None)
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.load", "--worker", json.dumps(config)],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if result.returncode:
+        raise RuntimeError(f"Load worker failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def print_table(results):
+    print(
+        f"{'nodes':>7} {'sessions':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+        f"{'reruns/s':>9} {'MB/session':>11} {'errors':>7}"
+    )
+    for row in results:
+        print(
+            f"{row['nodes']:>7} {row['sessions']:>8} {row['p50_s'] * 1000:>9.1f} {row['p95_s'] * 1000:>9.1f} "
+            f"{row['p99_s'] * 1000:>9.1f} {row['throughput_per_s']:>9.1f} "
+            f"{row['rss_per_session_bytes'] / 2**20:>11.2f} {len(row['errors']):>7}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="synthetic quest counts")
+    parser.add_argument("--curriculum", type=Path, help="load test this curriculum file instead of synthetic ones")
+    parser.add_argument("--sessions", type=int, nargs="+", default=DEFAULT_SESSIONS, help="concurrent sessions")
+    parser.add_argument("--steps", type=int, default=30, help="reruns per session")
+    parser.add_argument("--reset-every", type=int, default=10, help="completions between progress resets")
+    parser.add_argument("--think", type=float, default=0.0, help="mean seconds a learner pauses between steps")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120, help="seconds before one rerun counts as hung")
+    parser.add_argument("--output", type=Path, help="also write the results JSON here")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_worker(json.loads(args.worker))))
+        return 0
+
+    from benchmarks.synthetic import generate_curriculum
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.curriculum:
+            sources = [args.curriculum]
+        else:
+            sources = [generate_curriculum(nodes, seed=args.seed) for nodes in args.sizes]
+        for source in sources:
+            # A fresh directory per curriculum, so each worker serves exactly one
+            directory = Path(tempfile.mkdtemp(dir=tmp))
+            if isinstance(source, Path):
+                curriculum_file = directory / f"{LOAD_CURRICULUM_ID}{source.suffix}"
+                shutil.copyfile(source, curriculum_file)
+            else:
+                curriculum_file = directory / f"{LOAD_CURRICULUM_ID}.json"
+                curriculum_file.write_text(json.dumps(source))
+            for sessions in args.sessions:
+                results.append(measure(curriculum_file, sessions, args))
+
+    print_table(results)
+    failed = [row for row in results if row["errors"]]
+    for row in failed:
+        print(f"\n{row['nodes']} nodes, {row['sessions']} sessions: {row['errors'][0]}", file=sys.stderr)
+    if args.output:
+        args.output.write_text(json.dumps({"meta": {"think_s": args.think, "steps": args.steps}, "results": results}, indent=2))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
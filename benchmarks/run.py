@@ -0,0 +1,188 @@
+"""Time each stage of a map rerun on synthetic curricula and compare against a baseline.
+
+    python -m benchmarks.run --sizes 100 1000 3000
+    python -m benchmarks.run --save-baseline          # record this machine's numbers
+    python -m benchmarks.run --threshold 0.25         # exit 1 on a >25% slowdown
+
+Stages are timed separately: graph construction, availability checks, map
+network build, HTML generation and zone-progress aggregation.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import networkx as nx
+
+from benchmarks.synthetic import generate_curriculum
+from curriculum import compile_curriculum
+from quest_engine import AvailabilityEngine
+from world_map import build_network, compute_layout
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+DEFAULT_SIZES = [100, 1000, 3000]
+
+# Generator arguments a baseline is only comparable under
+GENERATOR_PARAMETERS = ("zones", "edge_density", "depth", "seed")
+
+
+def time_stage(func, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, timings
+
+
+def half_completed(curriculum):
+    # A learner who finished the first half of the curriculum in prerequisite order
+    order = list(nx.topological_sort(curriculum.graph))
+    return order[: len(order) // 2]
+
+
+def benchmark_size(nodes, args):
+    data = generate_curriculum(nodes, args.zones, args.edge_density, args.depth, args.seed)
+    results = {}
+
+    curriculum, results["graph_construction"] = time_stage(
+        lambda: compile_curriculum(f"synthetic-{nodes}", data, "bench"), args.repeat
+    )
+    completed = half_completed(curriculum)
+    quest_ids = curriculum.index.quest_ids
+
+    def availability():
+        engine = AvailabilityEngine(curriculum.index, completed)
+        for quest_id in quest_ids:
+            engine.is_available(quest_id)
+        return engine
+
+    engine, results["availability_checks"] = time_stage(availability, args.repeat)
+    layout = compute_layout(curriculum.index)
+
+    net, results["network_build"] = time_stage(
+        lambda: build_network(curriculum.quests, engine, layout), args.repeat
+    )
+    _, results["html_generation"] = time_stage(net.generate_html, args.repeat)
+
+    def zone_progress():
+        completed_counts = engine.zone_completed_counts()
+        available_counts = engine.zone_available_counts()
+        available = [engine.available_quests(zone) for zone in curriculum.index.zones]
+        return completed_counts, available_counts, engine.completion_rate(), available
+
+    _, results["zone_progress"] = time_stage(zone_progress, args.repeat)
+
+    return [
+        {
+            "nodes": nodes,
+            "edges": len(data["edges"]),
+            "stage": stage,
+            "median_s": statistics.median(timings),
+            "min_s": min(timings),
+            "runs": len(timings),
+        }
+        for stage, timings in results.items()
+    ]
+
+
+def mismatched_parameters(meta, args):
+    """Return {parameter: (baseline value, current value)} for generator arguments that differ."""
+    return {
+        name: (meta.get(name), getattr(args, name))
+        for name in GENERATOR_PARAMETERS
+        if meta.get(name) != getattr(args, name)
+    }
+
+
+def compare(results, baseline, threshold):
+    expected = {(row["nodes"], row["stage"]): row["median_s"] for row in baseline["results"]}
+    regressions = []
+    for row in results:
+        before = expected.get((row["nodes"], row["stage"]))
+        if before:
+            row["baseline_s"] = before
+            row["ratio"] = row["median_s"] / before
+            if row["ratio"] > 1 + threshold:
+                regressions.append(row)
+    return regressions
+
+
+def print_table(results):
+    print(f"{'nodes':>7} {'stage':<20} {'median ms':>11} {'min ms':>10} {'vs baseline':>12}")
+    for row in results:
+        ratio = f"{row['ratio']:.2f}x" if "ratio" in row else "-"
+        print(
+            f"{row['nodes']:>7} {row['stage']:<20} {row['median_s'] * 1000:>11.2f} "
+            f"{row['min_s'] * 1000:>10.2f} {ratio:>12}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="quest counts to benchmark")
+    parser.add_argument("--zones", type=int, default=8)
+    parser.add_argument("--edge-density", type=float, default=1.5)
+    parser.add_argument("--depth", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per stage")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--output", type=Path, help="also write the results JSON here")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if not args.save_baseline and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        mismatched = mismatched_parameters(baseline.get("meta", {}), args)
+        if mismatched:
+            differences = ", ".join(f"{name} {before} vs {now}" for name, (before, now) in mismatched.items())
+            print(
+                f"{args.baseline} was recorded with other curriculum parameters ({differences}); "
+                "rerun with the baseline's parameters or pass --save-baseline",
+                file=sys.stderr,
+            )
+            return 2
+
+    results = []
+    for nodes in args.sizes:
+        results.extend(benchmark_size(nodes, args))
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "zones": args.zones,
+            "edge_density": args.edge_density,
+            "depth": args.depth,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    regressions = compare(results, baseline, args.threshold) if baseline else []
+
+    print_table(results)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"Baseline written to {args.baseline}")
+
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) slower than baseline by more than {args.threshold:.0%}:")
+        for row in regressions:
+            print(f"  {row['nodes']} nodes, {row['stage']}: {row['ratio']:.2f}x")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
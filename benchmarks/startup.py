@@ -0,0 +1,147 @@
+"""Measure cold-start and per-rerun setup cost of the app, each sample in a fresh interpreter.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --save-baseline
+    python -m benchmarks.startup --curriculum big.json --repeat 10
+
+Stages:
+
+- ``import_modules``: importing the map modules, and which heavy libraries that pulls in
+- ``load_curriculum``: loading a curriculum whose snapshot is already on disk
+- ``app_first_run``: the first AppTest run of app.py, i.e. time to first paint
+- ``app_rerun``: a second run of the same session
+- ``map_render_first`` / ``map_render_repeat``: building the map HTML once and again
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.run import compare, print_table
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).parent / "startup_baseline.json"
+DEFAULT_CURRICULUM = ROOT / "curricula" / "python.json"
+
+# Libraries whose import cost the app should only pay when it needs them
+HEAVY_MODULES = ("networkx", "pyvis", "jinja2", "IPython")
+
+_PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+timings = {{}}
+
+start = time.perf_counter()
+import curriculum, quest_engine, world_map
+timings["import_modules"] = time.perf_counter() - start
+loaded = [name for name in {heavy!r} if name in sys.modules]
+
+start = time.perf_counter()
+loaded_curriculum = curriculum.load_curriculum({curriculum!r})
+timings["load_curriculum"] = time.perf_counter() - start
+
+engine = quest_engine.AvailabilityEngine(loaded_curriculum.index, loaded_curriculum.starting_quests)
+layout = world_map.compute_layout(loaded_curriculum.index)
+for stage in ("map_render_first", "map_render_repeat"):
+    start = time.perf_counter()
+    world_map.build_network(loaded_curriculum.quests, engine, layout).generate_html()
+    timings[stage] = time.perf_counter() - start
+
+print(json.dumps({{"timings": timings, "loaded": loaded, "quests": len(loaded_curriculum.index)}}))
+"""
+
+_APP_PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+from benchmarks.apptest_compat import patch_apptest
+from streamlit.testing.v1 import AppTest
+
+patch_apptest()
+
+at = AppTest.from_file({app!r}, default_timeout=120)
+start = time.perf_counter()
+at.run()
+first = time.perf_counter() - start
+start = time.perf_counter()
+at.run()
+rerun = time.perf_counter() - start
+print(json.dumps({{"timings": {{"app_first_run": first, "app_rerun": rerun}}, "errors": len(at.exception)}}))
+"""
+
+
+def run_probe(code):
+    env = dict(os.environ, MAP_PROGRESS_BACKEND="memory")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(f"Benchmark probe failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--curriculum", type=Path, default=DEFAULT_CURRICULUM)
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per stage")
+    parser.add_argument("--skip-app", action="store_true", help="skip the (slower) AppTest stages")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--output", type=Path, help="also write the results JSON here")
+    args = parser.parse_args(argv)
+
+    probe = _PROBE.format(root=str(ROOT), heavy=HEAVY_MODULES, curriculum=str(args.curriculum.resolve()))
+    app_probe = _APP_PROBE.format(root=str(ROOT), app=str(ROOT / "app.py"))
+
+    run_probe(probe)  # Writes the curriculum snapshot so every measured load is a warm one
+    samples = {}
+    loaded, quests = [], 0
+    for _ in range(args.repeat):
+        result = run_probe(probe)
+        loaded, quests = result["loaded"], result["quests"]
+        for stage, seconds in result["timings"].items():
+            samples.setdefault(stage, []).append(seconds)
+        if not args.skip_app:
+            result = run_probe(app_probe)
+            if result["errors"]:
+                print("app.py raised during the AppTest run", file=sys.stderr)
+                return 1
+            for stage, seconds in result["timings"].items():
+                samples.setdefault(stage, []).append(seconds)
+
+    results = [
+        {
+            "nodes": quests,
+            "stage": stage,
+            "median_s": statistics.median(timings),
+            "min_s": min(timings),
+            "runs": len(timings),
+        }
+        for stage, timings in samples.items()
+    ]
+
+    regressions = []
+    if not args.save_baseline and args.baseline.exists():
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.threshold)
+
+    print_table(results)
+    print(f"\nHeavy modules imported by the map modules: {', '.join(loaded) or 'none'}")
+    report = {"meta": {"curriculum": str(args.curriculum), "heavy_imports": loaded}, "results": results}
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"Baseline written to {args.baseline}")
+
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) slower than baseline by more than {args.threshold:.0%}:")
+        for row in regressions:
+            print(f"  {row['stage']}: {row['ratio']:.2f}x")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
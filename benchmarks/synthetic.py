@@ -0,0 +1,84 @@
+"""Synthetic curricula shaped like curricula/python.json, for benchmarking at scale.
+
+    python -m benchmarks.synthetic --nodes 5000 --zones 12 --out /tmp/big.json
+"""
+
+import argparse
+import json
+import random
+
+DIFFICULTIES = ["Beginner", "Beginner+", "Intermediate", "Advanced"]
+ZONE_COLORS = ["#4CAF50", "#7E57C2", "#2196F3", "#FF9800", "#F44336", "#9C27B0", "#009688", "#795548"]
+
+
+def generate_curriculum(nodes=1000, zones=8, edge_density=1.5, depth=20, seed=0):
+    """Return a curriculum dict with ``nodes`` quests spread over ``depth`` levels.
+
+    Every quest past the first level gets on average ``edge_density``
+    prerequisites, all drawn from earlier levels, so the result is a DAG.
+    Zones are contiguous bands of levels, like the hand-written curriculum.
+    """
+    rng = random.Random(seed)
+    depth = max(1, min(depth, nodes))
+    zones = max(1, min(zones, nodes))
+
+    # Spread quests over levels, making sure every level has at least one
+    levels = list(range(depth)) + [rng.randrange(depth) for _ in range(nodes - depth)]
+    levels.sort()
+
+    quests = {}
+    by_level = [[] for _ in range(depth)]
+    for i, level in enumerate(levels):
+        quest_id = f"quest_{i:06d}"
+        zone_number = min(zones - 1, i * zones // nodes)
+        quests[quest_id] = {
+            "title": f"Quest {i}",
+            "description": f"Synthetic quest {i} on level {level}.",
+            "topics": [f"Topic {i}.{t}" for t in range(4)],
+            "resources": [f"Resource {i}.{r}" for r in range(2)],
+            "difficulty": DIFFICULTIES[min(len(DIFFICULTIES) - 1, level * len(DIFFICULTIES) // depth)],
+            "xp_reward": rng.randrange(100, 500, 50),
+            "estimated_hours": rng.randint(2, 8),
+            "color": ZONE_COLORS[zone_number % len(ZONE_COLORS)],
+            "zone": f"Zone {zone_number + 1:03d}",
+        }
+        by_level[level].append(quest_id)
+
+    edges = []
+    earlier = list(by_level[0])
+    for level in range(1, depth):
+        previous = by_level[level - 1]
+        for quest_id in by_level[level]:
+            # At least one prerequisite from the level just above keeps the depth intact
+            prerequisites = {rng.choice(previous)}
+            extra = int(edge_density) - 1 + (rng.random() < edge_density % 1)
+            for _ in range(max(0, extra)):
+                prerequisites.add(rng.choice(earlier))
+            edges.extend([prerequisite, quest_id] for prerequisite in sorted(prerequisites))
+        earlier.extend(by_level[level])
+
+    return {
+        "name": f"Synthetic {nodes}",
+        "starting_quests": [by_level[0][0]],
+        "quests": quests,
+        "edges": edges,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic curriculum file.")
+    parser.add_argument("--nodes", type=int, default=1000)
+    parser.add_argument("--zones", type=int, default=8)
+    parser.add_argument("--edge-density", type=float, default=1.5, help="average prerequisites per quest")
+    parser.add_argument("--depth", type=int, default=20, help="number of prerequisite levels")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args(argv)
+
+    curriculum = generate_curriculum(args.nodes, args.zones, args.edge_density, args.depth, args.seed)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(curriculum, f)
+
+
+if __name__ == "__main__":
+    main()
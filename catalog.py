@@ -0,0 +1,243 @@
+"""Hosting several curricula in one process, each reloaded when its file changes.
+
+Every ``*.json``/``*.yaml`` file in the curricula directory is served under
+its file stem (``curricula/sql.json`` is ``sql``). A watcher thread polls the
+files' modification times. A changed file is compiled in a child process,
+which writes its snapshot and pickles every artifact in ``ARTIFACT_BUILDERS``
+next to it. The watcher itself only unpickles those files, which holds the
+GIL for a fraction of a second instead of for the compile and builds (tens of
+seconds for very large curricula), so other curricula's sessions keep
+running. The new version is swapped in only once it has loaded; until then
+sessions keep reading the previous one. A file that fails to load leaves the
+previous version in place and its error in ``errors``.
+
+Anything derived from a curriculum (layout, search index, ...) is kept on the
+``HostedCurriculum`` of that version, so a reload drops exactly that
+curriculum's artifacts and no other. An artifact the child did not ship is
+built on first use.
+
+Snapshots and artifacts can also be written ahead of a deploy:
+
+    python -c "import catalog, sys; sys.exit(catalog.main())" curricula/*.json
+"""
+
+import argparse
+import pickle
+import subprocess
+import sys
+import threading
+import traceback
+from pathlib import Path
+
+from curriculum import CurriculumError, load_curriculum, snapshot_path, write_pickle
+from planner import QuestPlanner
+from recommend import QuestRecommender
+from search import QuestSearchIndex
+from world_map import compute_layout
+
+# Files picked up from the curricula directory
+CURRICULUM_SUFFIXES = (".json", ".yaml", ".yml")
+
+# Seconds between checks for changed curriculum files
+POLL_SECONDS = 2.0
+
+# Compiles a curriculum and writes its snapshot and artifacts in a child process.
+# It imports the module rather than running a file as a script, so the pickles
+# name curriculum.Curriculum and not __main__.Curriculum.
+COMPILE_COMMAND = (sys.executable, "-c", "import catalog, sys; sys.exit(catalog.main())")
+COMPILE_CWD = Path(__file__).resolve().parent
+
+# Seconds a compile child may run before it is killed and treated as failed
+COMPILE_TIMEOUT_SECONDS = 600
+
+# What every session of a curriculum version shares, by name
+ARTIFACT_BUILDERS = {
+    "map_layout": lambda curriculum: compute_layout(curriculum.index),
+    "search_index": lambda curriculum: QuestSearchIndex(curriculum.quests, curriculum.index),
+    "planner": lambda curriculum: QuestPlanner(curriculum.index),
+    "recommender": lambda curriculum: QuestRecommender(curriculum.index),
+}
+
+# Bump whenever ARTIFACT_BUILDERS or the pickled layout of an artifact class
+# (QuestSearchIndex, QuestPlanner, ...) changes, so old artifact files are ignored
+ARTIFACT_FORMAT = 1
+
+
+def artifacts_path(path, version):
+    # Named like the snapshot, so replacing the snapshot also clears stale artifacts
+    snapshot = snapshot_path(path, version)
+    return snapshot.with_name(snapshot.name.replace(".pickle", f".artifacts.v{ARTIFACT_FORMAT}.pickle"))
+
+
+def build_artifacts(path):
+    """Load a curriculum (writing its snapshot) and pickle all of its artifacts next to it."""
+    path = Path(path)
+    curriculum = load_curriculum(path)
+    artifacts = {name: build(curriculum) for name, build in ARTIFACT_BUILDERS.items()}
+    write_pickle(artifacts_path(path, curriculum.version), artifacts)
+    return curriculum
+
+
+class HostedCurriculum:
+    """One loaded version of a curriculum and the artifacts built from it."""
+
+    def __init__(self, curriculum_id, path, curriculum, mtime_ns):
+        self.curriculum_id = curriculum_id
+        self.path = path
+        self.curriculum = curriculum
+        self.mtime_ns = mtime_ns
+        # Cache key unique to this curriculum and version
+        self.key = f"{curriculum_id}:{curriculum.version}"
+        self._artifacts = {}
+        self._lock = threading.Lock()
+
+    def artifact(self, name):
+        """Return the named artifact of ``ARTIFACT_BUILDERS``, built once for this version."""
+        try:
+            return self._artifacts[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._artifacts:
+                self._artifacts[name] = ARTIFACT_BUILDERS[name](self.curriculum)
+            return self._artifacts[name]
+
+    def load_artifacts(self):
+        """Adopt the artifacts a compile child pickled for this version, if any."""
+        try:
+            with open(artifacts_path(self.path, self.curriculum.version), "rb") as f:
+                artifacts = pickle.load(f)
+        except Exception:
+            return  # Missing or unreadable; each artifact is built on first use instead
+        with self._lock:
+            for name, value in artifacts.items():
+                self._artifacts.setdefault(name, value)
+
+
+class CurriculumCatalog:
+    """The curricula found in a directory, by id."""
+
+    def __init__(self, directory, poll_seconds=POLL_SECONDS):
+        self.directory = Path(directory)
+        self.poll_seconds = poll_seconds
+        self.errors = {}
+        self._hosted = {}
+        self._failed_mtimes = {}
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+        self.refresh(compile_in_child=False)
+
+    def __contains__(self, curriculum_id):
+        return curriculum_id in self._hosted
+
+    def __len__(self):
+        return len(self._hosted)
+
+    def ids(self):
+        return sorted(self._hosted)
+
+    def get(self, curriculum_id):
+        """Return the current ``HostedCurriculum``; raises KeyError for unknown ids."""
+        return self._hosted[curriculum_id]
+
+    def sources(self):
+        """Map each curriculum id to its source file; the first suffix listed wins a tie."""
+        found = {}
+        for suffix in CURRICULUM_SUFFIXES:
+            for path in sorted(self.directory.glob(f"*{suffix}")):
+                found.setdefault(path.stem, path)
+        return found
+
+    def refresh(self, compile_in_child=True):
+        """Load new and changed curricula and drop removed ones; returns the ids that changed."""
+        with self._refresh_lock:
+            sources = self.sources()
+            changed = [curriculum_id for curriculum_id in self._hosted if curriculum_id not in sources]
+            for curriculum_id in changed:
+                del self._hosted[curriculum_id]
+            for curriculum_id in list(self.errors):
+                if curriculum_id not in sources:
+                    del self.errors[curriculum_id]
+                    self._failed_mtimes.pop(curriculum_id, None)
+
+            for curriculum_id, path in sources.items():
+                if self._reload(curriculum_id, path, compile_in_child):
+                    changed.append(curriculum_id)
+            return changed
+
+    def _reload(self, curriculum_id, path, compile_in_child):
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+        except OSError:
+            return False
+        current = self._hosted.get(curriculum_id)
+        if current is not None and current.path == path and current.mtime_ns == mtime_ns:
+            return False
+        if self._failed_mtimes.get(curriculum_id) == mtime_ns:
+            return False  # Still the same broken file
+
+        if compile_in_child:
+            # Only warms the snapshot and artifacts; errors are reported by the load below
+            try:
+                subprocess.run(
+                    [*COMPILE_COMMAND, str(path.resolve())],
+                    cwd=COMPILE_CWD,
+                    capture_output=True,
+                    timeout=COMPILE_TIMEOUT_SECONDS,
+                )
+            except (OSError, subprocess.TimeoutExpired):
+                pass  # Same as a failed compile: run kills the child on timeout
+        try:
+            curriculum = load_curriculum(path)
+        except Exception as error:
+            # Anything a malformed file can raise; the previous version keeps serving
+            self.errors[curriculum_id] = error
+            self._failed_mtimes[curriculum_id] = mtime_ns
+            return False
+        self.errors.pop(curriculum_id, None)
+        self._failed_mtimes.pop(curriculum_id, None)
+
+        if current is not None and current.curriculum.version == curriculum.version:
+            # Touched but not edited: keep the artifacts already built
+            current.mtime_ns = mtime_ns
+            return False
+
+        hosted = HostedCurriculum(curriculum_id, path, curriculum, mtime_ns)
+        hosted.load_artifacts()
+        self._hosted[curriculum_id] = hosted
+        return True
+
+    def start(self):
+        """Start the watcher thread (once)."""
+        if self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch, name="curriculum-watcher", daemon=True)
+            self._watcher.start()
+
+    def close(self):
+        self._stop.set()
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.refresh()
+            except Exception:
+                # Hot reload must outlive any one bad refresh
+                traceback.print_exc()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate curriculum files and write their snapshots and artifacts.")
+    parser.add_argument("paths", nargs="+", help="curriculum JSON or YAML files")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for path in args.paths:
+        try:
+            curriculum = build_artifacts(path)
+        except CurriculumError as error:
+            print(error, file=sys.stderr)
+            failed = True
+        else:
+            print(f"{path}: {len(curriculum.index)} quests, version {curriculum.version}")
+    return 1 if failed else 0
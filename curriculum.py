@@ -0,0 +1,378 @@
+"""Loading, validation and snapshot caching of curriculum files.
+
+A curriculum file (JSON, or YAML when PyYAML is installed) looks like::
+
+    {
+        "name": "Python Learning RPG Map",
+        "starting_quests": ["basics_intro"],
+        "quests": {"basics_intro": {"title": ..., "zone": ..., ...}, ...},
+        "edges": [["basics_intro", "basics_syntax"], ...]
+    }
+
+Quests are compiled into slotted ``Quest`` records whose zone, difficulty and
+colour strings are shared between quests. Descriptions, topics and resources
+are only needed for the one quest a learner is reading, so they stay packed
+in ``QuestDetails`` and are decoded on demand.
+
+The first load validates the file and pickles the compiled result next to it.
+Later loads only hash the source bytes and reuse the snapshot when the hash
+still matches. Snapshots can also be written ahead of time, by going through
+the module so the pickles name ``curriculum.Curriculum`` (running this file as
+a script would pickle ``__main__.Curriculum``, which nothing else can load):
+
+    python -c "import curriculum, sys; sys.exit(curriculum.main())" curricula/*.json
+"""
+
+import argparse
+import functools
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+from collections import namedtuple
+from collections.abc import Hashable, Mapping
+from pathlib import Path
+
+import numpy as np
+
+from quest_engine import QuestIndex
+
+# Fields every quest must define
+REQUIRED_FIELDS = (
+    "title",
+    "description",
+    "topics",
+    "resources",
+    "difficulty",
+    "xp_reward",
+    "estimated_hours",
+    "color",
+    "zone",
+)
+
+# Fields that must hold numbers, lists and strings
+NUMERIC_FIELDS = ("xp_reward", "estimated_hours")
+LIST_FIELDS = ("topics", "resources")
+TEXT_FIELDS = ("title", "description", "difficulty", "color", "zone")
+
+# Fields kept out of the Quest records and decoded only when asked for
+DETAIL_FIELDS = ("description", "topics", "resources")
+
+# Number of quests whose details stay decoded per curriculum
+DETAIL_CACHE_SIZE = 256
+
+# Bump whenever the pickled layout of Curriculum (or anything it holds) changes
+SNAPSHOT_FORMAT = 4
+
+SNAPSHOT_DIR_NAME = ".snapshots"
+
+
+class CurriculumError(ValueError):
+    """Raised when a curriculum file is malformed."""
+
+    def __init__(self, path, problems):
+        self.path = path
+        self.problems = list(problems)
+        super().__init__(f"Invalid curriculum {path}:\n" + "\n".join(f"- {p}" for p in self.problems))
+
+
+# The rich text of one quest
+QuestDetail = namedtuple("QuestDetail", DETAIL_FIELDS)
+
+
+def _shared(value):
+    # Quests of one zone or difficulty all point at the same string
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class QuestDetails:
+    """Every quest's description, topics and resources, packed into one bytes blob.
+
+    Each quest is a JSON slice of the blob, found through ``offsets`` and
+    decoded on request. Only the ``DETAIL_CACHE_SIZE`` most recently read
+    quests stay decoded.
+    """
+
+    def __init__(self, details):
+        encoded = [json.dumps(detail, separators=(",", ":")).encode() for detail in details]
+        self.offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(chunk) for chunk in encoded], out=self.offsets[1:])
+        self.blob = b"".join(encoded)
+        self._cache()
+
+    def _cache(self):
+        self.get = functools.lru_cache(maxsize=DETAIL_CACHE_SIZE)(self.decode)
+
+    def decode(self, position):
+        """Decode the details of the quest at ``position``, bypassing the cache."""
+        description, topics, resources = json.loads(self.blob[self.offsets[position]:self.offsets[position + 1]])
+        return QuestDetail(description, tuple(topics), tuple(resources))
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["get"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._cache()
+
+
+class Quest:
+    """One quest's summary fields; ``description``, ``topics`` and ``resources`` load on demand."""
+
+    __slots__ = ("quest_id", "position", "title", "zone", "difficulty", "color", "xp_reward", "estimated_hours", "_details")
+
+    def __init__(self, quest_id, position, quest, details):
+        self.quest_id = quest_id
+        self.position = position
+        self.title = quest["title"]
+        self.zone = _shared(quest["zone"])
+        self.difficulty = _shared(quest["difficulty"])
+        self.color = _shared(quest["color"])
+        self.xp_reward = quest["xp_reward"]
+        self.estimated_hours = quest["estimated_hours"]
+        self._details = details
+
+    @property
+    def description(self):
+        return self._details.get(self.position).description
+
+    @property
+    def topics(self):
+        return self._details.get(self.position).topics
+
+    @property
+    def resources(self):
+        return self._details.get(self.position).resources
+
+    def attributes(self):
+        """The summary fields as a dict, e.g. for graph node data."""
+        return {
+            "title": self.title,
+            "zone": self.zone,
+            "difficulty": self.difficulty,
+            "color": self.color,
+            "xp_reward": self.xp_reward,
+            "estimated_hours": self.estimated_hours,
+        }
+
+    def __repr__(self):
+        return f"Quest({self.quest_id!r}, {self.title!r})"
+
+
+class QuestTable(Mapping):
+    """The curriculum's ``Quest`` records by id, in file order."""
+
+    def __init__(self, quests):
+        self.details = QuestDetails([[quest[field] for field in DETAIL_FIELDS] for quest in quests.values()])
+        self._quests = {
+            quest_id: Quest(quest_id, position, quest, self.details)
+            for position, (quest_id, quest) in enumerate(quests.items())
+        }
+
+    def __getitem__(self, quest_id):
+        return self._quests[quest_id]
+
+    def __iter__(self):
+        return iter(self._quests)
+
+    def __len__(self):
+        return len(self._quests)
+
+
+class Curriculum:
+    """A validated curriculum: ``Quest`` records by id in ``quests``, and its quest index.
+
+    The networkx graph is only built when something asks for it, and is left
+    out of snapshots, so loading a snapshot never imports networkx.
+    """
+
+    def __init__(self, name, version, quests, edges, starting_quests):
+        self.name = name
+        self.version = version
+        self.quests = QuestTable(quests)
+        self.edges = edges
+        self.starting_quests = starting_quests
+        self._graph = None
+        self.index = QuestIndex(self.graph)
+
+    @property
+    def graph(self):
+        """The frozen prerequisite graph, with each quest's summary fields as node data."""
+        if self._graph is None:
+            import networkx as nx
+
+            graph = nx.DiGraph()
+            graph.add_nodes_from((quest_id, quest.attributes()) for quest_id, quest in self.quests.items())
+            graph.add_edges_from(self.edges)
+            self._graph = nx.freeze(graph)
+        return self._graph
+
+    def __getstate__(self):
+        return dict(self.__dict__, _graph=None)
+
+
+def parse_source(path, raw):
+    if Path(path).suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise CurriculumError(path, ["PyYAML is required to load YAML curricula"]) from None
+        try:
+            data = yaml.safe_load(raw)
+        except yaml.YAMLError as error:
+            raise CurriculumError(path, [f"not valid YAML: {error}"]) from None
+    else:
+        try:
+            data = json.loads(raw)
+        except ValueError as error:
+            raise CurriculumError(path, [f"not valid JSON: {error}"]) from None
+    return data
+
+
+def validate(path, data):
+    problems = []
+    if not isinstance(data, dict):
+        raise CurriculumError(path, ["top level must be a mapping"])
+
+    quests = data.get("quests")
+    edges = data.get("edges", [])
+    if not isinstance(quests, dict) or not quests:
+        problems.append("'quests' must be a non-empty mapping of quest id to quest")
+        quests = {}
+    if not isinstance(edges, list):
+        problems.append("'edges' must be a list of [prerequisite, quest] pairs")
+        edges = []
+
+    for quest_id, quest in quests.items():
+        if not isinstance(quest_id, str):
+            problems.append(f"quest id {quest_id!r} must be a string")
+        if not isinstance(quest, dict):
+            problems.append(f"quest '{quest_id}' must be a mapping")
+            continue
+        missing = [field for field in REQUIRED_FIELDS if field not in quest]
+        if missing:
+            problems.append(f"quest '{quest_id}' is missing {', '.join(missing)}")
+        for field in NUMERIC_FIELDS:
+            value = quest.get(field, 0)
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                problems.append(f"quest '{quest_id}' {field} must be a number, not {value!r}")
+        for field in LIST_FIELDS:
+            if not isinstance(quest.get(field, []), list):
+                problems.append(f"quest '{quest_id}' {field} must be a list")
+        for field in TEXT_FIELDS:
+            value = quest.get(field, "")
+            if not isinstance(value, str):
+                problems.append(f"quest '{quest_id}' {field} must be a string, not {value!r}")
+
+    for edge in edges:
+        if not isinstance(edge, (list, tuple)) or len(edge) != 2:
+            problems.append(f"edge {edge!r} must be a [prerequisite, quest] pair")
+            continue
+        for end in edge:
+            if not isinstance(end, Hashable) or end not in quests:
+                problems.append(f"edge {edge[0]} -> {edge[1]} references unknown quest '{end}'")
+
+    starting_quests = data.get("starting_quests", [])
+    if not isinstance(starting_quests, list):
+        problems.append("'starting_quests' must be a list of quest ids")
+        starting_quests = []
+    for quest_id in starting_quests:
+        if not isinstance(quest_id, Hashable) or quest_id not in quests:
+            problems.append(f"starting quest '{quest_id}' is not defined")
+
+    if not problems:
+        import networkx as nx
+
+        graph = nx.DiGraph(edges)
+        try:
+            cycle = nx.find_cycle(graph)
+        except nx.NetworkXNoCycle:
+            cycle = None
+        if cycle:
+            problems.append("prerequisites form a cycle: " + " -> ".join(u for u, _ in cycle) + f" -> {cycle[0][0]}")
+
+    if problems:
+        raise CurriculumError(path, problems)
+
+
+def compile_curriculum(path, data, version):
+    validate(path, data)
+    return Curriculum(
+        name=data.get("name", Path(path).stem),
+        version=version,
+        quests=data["quests"],
+        edges=[tuple(edge) for edge in data.get("edges", [])],
+        starting_quests=frozenset(data.get("starting_quests", [])),
+    )
+
+
+def snapshot_path(path, version, snapshot_dir=None):
+    path = Path(path)
+    snapshot_dir = Path(snapshot_dir) if snapshot_dir else path.parent / SNAPSHOT_DIR_NAME
+    return snapshot_dir / f"{path.stem}-{version}.v{SNAPSHOT_FORMAT}.pickle"
+
+
+def load_curriculum(path, snapshot_dir=None):
+    """Load a curriculum, reusing the compiled snapshot when the source is unchanged."""
+    path = Path(path)
+    raw = path.read_bytes()
+    version = hashlib.sha256(raw).hexdigest()[:16]
+    snapshot = snapshot_path(path, version, snapshot_dir)
+
+    if snapshot.exists():
+        try:
+            with open(snapshot, "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            pass  # Corrupt or stale snapshot; rebuild it below
+
+    curriculum = compile_curriculum(path, parse_source(path, raw), version)
+    try:
+        write_snapshot(snapshot, curriculum, path.stem)
+    except OSError:
+        pass  # Read-only deployments still work, they just recompile on restart
+    return curriculum
+
+
+def write_snapshot(snapshot, curriculum, stem):
+    snapshot.parent.mkdir(parents=True, exist_ok=True)
+
+    # Drop snapshots of older versions of the same curriculum
+    for old in snapshot.parent.glob(f"{stem}-*.pickle"):
+        if old != snapshot and old.name.rsplit("-", 1)[0] == stem:
+            old.unlink(missing_ok=True)
+
+    write_pickle(snapshot, curriculum)
+
+
+def write_pickle(target, value):
+    """Pickle ``value`` to ``target`` atomically, so concurrent processes never read a partial file."""
+    fd, tmp_path = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, target)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate curriculum files and write their snapshots.")
+    parser.add_argument("paths", nargs="+", help="curriculum JSON or YAML files")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for path in args.paths:
+        try:
+            curriculum = load_curriculum(path)
+        except CurriculumError as error:
+            print(error, file=sys.stderr)
+            failed = True
+        else:
+            print(f"{path}: {len(curriculum.index)} quests, version {curriculum.version}")
+    return 1 if failed else 0
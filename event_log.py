@@ -0,0 +1,365 @@
+"""Append-only log of quest completions and resets, with snapshot compaction.
+
+Every completion and reset is stored as an event with its time and learner.
+A learner's state is rebuilt from their newest snapshot plus the events after
+it. A new snapshot is written whenever that tail reaches ``snapshot_every``
+events, so restoring costs the same for a learner with ten events or ten
+thousand. Events are kept for the audit history unless a compaction is asked
+to prune them.
+
+The log is the source of truth. Recorded events are written by a background
+writer in one transaction per batch. The writer then restores every learner
+the batch touched from the log and saves the result to the progress store,
+which is only a projection of the log for readers such as cohort analytics.
+
+    python event_log.py history --learner 3f2a...
+    python event_log.py compact [--prune]
+"""
+
+import argparse
+import atexit
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+from collections import namedtuple
+from pathlib import Path
+
+from curriculum import CurriculumError, load_curriculum
+from progress_store import ProgressRecord
+from quest_engine import LearnerProgress
+
+# Event kinds
+COMPLETE = "complete"
+RESET = "reset"
+
+# Tail length at which a learner gets a fresh snapshot
+SNAPSHOT_EVERY = 50
+
+Event = namedtuple("Event", ["seq", "ts", "learner_id", "curriculum_id", "kind", "quest_id"])
+
+# A recorded event the writer has not committed yet, with what replaying it needs
+PendingEvent = namedtuple(
+    "PendingEvent", ["ts", "learner_id", "curriculum_id", "kind", "quest_id", "index", "starting_quests"]
+)
+
+
+class EventLog:
+    """SQLite-backed event log shared by every session of a process.
+
+    ``store``, when given, receives every touched learner's state after each
+    batch is written.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS events (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            ts REAL NOT NULL,
+            learner_id TEXT NOT NULL,
+            curriculum_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            quest_id TEXT
+        );
+        CREATE INDEX IF NOT EXISTS events_by_learner ON events (learner_id, curriculum_id, seq);
+        CREATE TABLE IF NOT EXISTS snapshots (
+            learner_id TEXT NOT NULL,
+            curriculum_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            completed TEXT NOT NULL,
+            total_xp INTEGER NOT NULL,
+            current_level INTEGER NOT NULL,
+            PRIMARY KEY (learner_id, curriculum_id)
+        );
+    """
+
+    INSERT = "INSERT INTO events (ts, learner_id, curriculum_id, kind, quest_id) VALUES (?, ?, ?, ?, ?)"
+
+    def __init__(self, path, store=None, snapshot_every=SNAPSHOT_EVERY, flush_interval=0.25, batch_size=500):
+        self.path = str(path)
+        self.store = store
+        self.snapshot_every = snapshot_every
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+
+        # Recorded events waiting for the writer, and the batch it is committing.
+        # Lock order is _lock, then _pending_lock.
+        self._pending = []
+        self._in_flight = []
+        self._projecting = False
+        self._pending_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flushed = threading.Condition(self._pending_lock)
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="event-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def flush(self, timeout=10):
+        """Block until every recorded event is written and projected.
+
+        Returns False on timeout, or when events are still waiting and the writer has stopped.
+        """
+        deadline = time.monotonic() + timeout
+        with self._pending_lock:
+            while self._pending or self._in_flight or self._projecting:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._writer.is_alive():
+                    return False
+                self._wake.set()
+                self._flushed.wait(timeout=min(remaining, 1))
+        return True
+
+    def close(self):
+        self.flush()
+        with self._pending_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wake.set()
+        self._writer.join(timeout=5)
+        with self._lock:
+            self._conn.close()
+
+    def append(self, learner_id, curriculum_id, kind, quest_id=None, ts=None):
+        """Record one event and return its sequence number."""
+        with self._lock:
+            cursor = self._conn.execute(
+                self.INSERT, (time.time() if ts is None else ts, learner_id, curriculum_id, kind, quest_id)
+            )
+            return cursor.lastrowid
+
+    def record(self, learner_id, curriculum_id, kind, quest_id, index, starting_quests):
+        """Queue an event for the writer; ``index`` and ``starting_quests`` are what it is replayed with."""
+        event = PendingEvent(time.time(), learner_id, curriculum_id, kind, quest_id, index, starting_quests)
+        with self._pending_lock:
+            if self._closed:
+                raise RuntimeError("event log is closed")
+            self._pending.append(event)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def snapshot(self, learner_id, curriculum_id, learner, seq=None):
+        """Store ``learner``'s state as of event ``seq`` (their newest event by default)."""
+        record = learner.to_record()
+        with self._lock:
+            if seq is None:
+                seq = self._conn.execute(
+                    "SELECT COALESCE(MAX(seq), 0) FROM events WHERE learner_id = ? AND curriculum_id = ?",
+                    (learner_id, curriculum_id),
+                ).fetchone()[0]
+            self._conn.execute(
+                "INSERT INTO snapshots VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (learner_id, curriculum_id) DO UPDATE SET "
+                "seq = excluded.seq, completed = excluded.completed, "
+                "total_xp = excluded.total_xp, current_level = excluded.current_level",
+                (learner_id, curriculum_id, seq, json.dumps(record.completed), record.total_xp, record.current_level),
+            )
+
+    def restore(self, learner_id, curriculum_id, index, starting_quests):
+        """Rebuild a ``LearnerProgress`` from the newest snapshot and the events after it.
+
+        Events still waiting for the writer are replayed last. Returns None
+        when the log knows nothing about the learner.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT seq, completed, total_xp, current_level FROM snapshots "
+                "WHERE learner_id = ? AND curriculum_id = ?",
+                (learner_id, curriculum_id),
+            ).fetchone()
+            after = row[0] if row else 0
+            tail = self._conn.execute(
+                "SELECT seq, kind, quest_id FROM events "
+                "WHERE learner_id = ? AND curriculum_id = ? AND seq > ? ORDER BY seq",
+                (learner_id, curriculum_id, after),
+            ).fetchall()
+            with self._pending_lock:
+                unwritten = [
+                    (event.kind, event.quest_id)
+                    for event in (*self._in_flight, *self._pending)
+                    if event.learner_id == learner_id and event.curriculum_id == curriculum_id
+                ]
+        if row is None and not tail and not unwritten:
+            return None
+
+        if row is None:
+            learner = LearnerProgress.start(index, starting_quests)
+        else:
+            learner = LearnerProgress.from_record(index, ProgressRecord(json.loads(row[1]), row[2], row[3]))
+        for _, kind, quest_id in tail:
+            apply_event(learner, kind, quest_id, starting_quests)
+
+        if len(tail) >= self.snapshot_every:
+            self.snapshot(learner_id, curriculum_id, learner, tail[-1][0])
+        for kind, quest_id in unwritten:
+            apply_event(learner, kind, quest_id, starting_quests)
+        return learner
+
+    def history(self, learner_id, curriculum_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, ts, learner_id, curriculum_id, kind, quest_id FROM events "
+                "WHERE learner_id = ? AND curriculum_id = ? ORDER BY seq",
+                (learner_id, curriculum_id),
+            ).fetchall()
+        return [Event(*row) for row in rows]
+
+    def compact(self, curriculum_id, index, starting_quests, prune=False):
+        """Snapshot every learner with a non-empty tail; with ``prune``, drop the events snapshots cover.
+
+        Returns the number of learners snapshotted.
+        """
+        with self._lock:
+            learner_ids = [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT DISTINCT e.learner_id FROM events e "
+                    "LEFT JOIN snapshots s ON s.learner_id = e.learner_id AND s.curriculum_id = e.curriculum_id "
+                    "WHERE e.curriculum_id = ? AND e.seq > COALESCE(s.seq, 0)",
+                    (curriculum_id,),
+                )
+            ]
+        for learner_id in learner_ids:
+            learner = self.restore(learner_id, curriculum_id, index, starting_quests)
+            self.snapshot(learner_id, curriculum_id, learner)
+
+        if prune:
+            with self._lock:
+                self._conn.execute(
+                    "DELETE FROM events WHERE curriculum_id = ? AND seq <= ("
+                    "SELECT s.seq FROM snapshots s WHERE s.learner_id = events.learner_id "
+                    "AND s.curriculum_id = events.curriculum_id)",
+                    (curriculum_id,),
+                )
+        return len(learner_ids)
+
+    def _write_loop(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            with self._pending_lock:
+                batch = self._in_flight = self._pending
+                self._pending = []
+                self._projecting = bool(batch)
+                closed = self._closed
+            try:
+                if batch and self._write_batch(batch):
+                    self._project(batch)
+            except Exception:
+                # One failed batch must not stop the writer; unwritten events are retried
+                traceback.print_exc()
+                with self._pending_lock:
+                    self._pending[:0] = self._in_flight
+                    self._in_flight = []
+            with self._pending_lock:
+                self._projecting = False
+                self._flushed.notify_all()
+            if closed:
+                return
+
+    def _write_batch(self, batch):
+        rows = [(event.ts, event.learner_id, event.curriculum_id, event.kind, event.quest_id) for event in batch]
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._conn.executemany(self.INSERT, rows)
+                    self._conn.execute("COMMIT")
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            except sqlite3.Error:
+                # Retry on the next tick, ahead of anything recorded since
+                with self._pending_lock:
+                    self._pending[:0] = batch
+                    self._in_flight = []
+                return False
+            # Cleared while still holding _lock, so restore() never sees the batch twice
+            with self._pending_lock:
+                self._in_flight = []
+        return True
+
+    def _project(self, batch):
+        # Restoring also snapshots learners whose tail has grown long
+        latest = {(event.learner_id, event.curriculum_id): event for event in batch}
+        for (learner_id, curriculum_id), event in latest.items():
+            learner = self.restore(learner_id, curriculum_id, event.index, event.starting_quests)
+            if self.store is not None:
+                self.store.save(learner_id, curriculum_id, learner.to_record())
+
+
+def apply_event(learner, kind, quest_id, starting_quests):
+    if kind == COMPLETE:
+        learner.complete(quest_id)
+    elif kind == RESET:
+        learner.reset(starting_quests)
+    else:
+        raise ValueError(f"Unknown event kind {kind!r}")
+
+
+def load_learner(event_log, store, learner_id, curriculum_id, index, starting_quests):
+    """Restore a learner from the log, falling back to the progress store, then to a fresh start.
+
+    Progress that only the store knows about is written to the log as a
+    snapshot, so later events replay on top of it.
+    """
+    learner = event_log.restore(learner_id, curriculum_id, index, starting_quests)
+    if learner is not None:
+        return learner
+
+    saved = store.load(learner_id, curriculum_id)
+    if saved is None:
+        return LearnerProgress.start(index, starting_quests)
+    learner = LearnerProgress.from_record(index, saved)
+    event_log.snapshot(learner_id, curriculum_id, learner)
+    return learner
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--log",
+        default=os.environ.get("MAP_EVENT_LOG", str(Path(__file__).parent / "events.db")),
+        help="event log database",
+    )
+    parser.add_argument(
+        "--curriculum",
+        default=str(Path(__file__).parent / "curricula" / "python.json"),
+        help="curriculum JSON or YAML file",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    history = commands.add_parser("history", help="print a learner's events")
+    history.add_argument("--learner", required=True)
+    compact = commands.add_parser("compact", help="snapshot every learner with new events")
+    compact.add_argument("--prune", action="store_true", help="also delete events covered by snapshots")
+    args = parser.parse_args(argv)
+
+    event_log = EventLog(args.log)
+    curriculum_id = Path(args.curriculum).stem
+    if args.command == "history":
+        for event in event_log.history(args.learner, curriculum_id):
+            when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(event.ts))
+            print(f"{event.seq:>8} {when} {event.kind:<9} {event.quest_id or ''}")
+        return 0
+
+    try:
+        curriculum = load_curriculum(args.curriculum)
+    except CurriculumError as error:
+        print(error, file=sys.stderr)
+        return 1
+    count = event_log.compact(curriculum_id, curriculum.index, curriculum.starting_quests, prune=args.prune)
+    print(f"Snapshotted {count} learners")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""Pre-render the world map as static pages that need no Python process to view.
+
+    python export_map.py --out site/
+    python export_map.py --out site/ --progress completed.json
+    python export_map.py --out site/ --learner 3f2a... --db progress.db --inline
+
+Writes ``index.html``/``index.json`` for the whole curriculum and one pair per
+zone under ``zones/``, plus a ``manifest.json`` listing them. The JSON files
+hold the vis.js node/edge payload; the HTML pages are standalone and load
+vis.js from a CDN unless ``--inline`` embeds it.
+"""
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+
+from curriculum import CurriculumError, load_curriculum
+from progress_store import create_progress_store
+from quest_engine import AvailabilityEngine
+from world_map import build_network, compute_layout, network_payload, zone_subgraph
+
+DEFAULT_CURRICULUM = Path(__file__).parent / "curricula" / "python.json"
+
+
+def zone_slug(zone):
+    return re.sub(r"[^a-z0-9]+", "-", zone.lower()).strip("-") or "zone"
+
+
+def read_completed(args, curriculum):
+    # Completed quests from a JSON file, a saved learner, or the starting quests
+    if args.progress:
+        data = json.loads(Path(args.progress).read_text(encoding="utf-8"))
+        return data["completed"] if isinstance(data, dict) else data
+    if args.learner:
+        # Opening the store would create an empty database where none exists
+        if not Path(args.db).is_file():
+            raise SystemExit(f"No progress database at {args.db}")
+        store = create_progress_store("sqlite", path=args.db)
+        try:
+            record = store.load(args.learner, Path(args.curriculum).stem)
+        finally:
+            store.close()
+        if record is None:
+            raise SystemExit(f"No saved progress for learner {args.learner!r} in {args.db}")
+        return record.completed
+    return curriculum.starting_quests
+
+
+def write_page(out_dir, name, net):
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / f"{name}.html").write_text(net.generate_html(), encoding="utf-8")
+    (out_dir / f"{name}.json").write_text(json.dumps(network_payload(net)), encoding="utf-8")
+
+
+def export_maps(curriculum, completed, out, cdn_resources="remote"):
+    """Write every page for ``completed`` progress into ``out`` and return the manifest."""
+    out = Path(out)
+    completed = [quest_id for quest_id in completed if quest_id in curriculum.index.positions]
+    engine = AvailabilityEngine(curriculum.index, completed)
+    layout = compute_layout(curriculum.index)
+
+    write_page(out, "index", build_network(curriculum.quests, engine, layout, cdn_resources=cdn_resources))
+    pages = [{"zone": None, "html": "index.html", "json": "index.json"}]
+    for zone in curriculum.index.zones:
+        slug = zone_slug(zone)
+        net = build_network(
+            curriculum.quests, engine, layout, zone_subgraph(engine, zone), cdn_resources=cdn_resources
+        )
+        write_page(out / "zones", slug, net)
+        pages.append({"zone": zone, "html": f"zones/{slug}.html", "json": f"zones/{slug}.json"})
+
+    manifest = {
+        "curriculum": curriculum.name,
+        "version": curriculum.version,
+        "completed": engine.completed_quests(),
+        "pages": pages,
+    }
+    (out / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--curriculum", default=str(DEFAULT_CURRICULUM), help="curriculum JSON or YAML file")
+    parser.add_argument("--out", required=True, help="output directory")
+    progress = parser.add_mutually_exclusive_group()
+    progress.add_argument("--progress", help='JSON file with completed quest ids (a list or {"completed": [...]})')
+    progress.add_argument("--learner", help="learner id whose saved progress to render")
+    parser.add_argument("--db", default=str(Path(__file__).parent / "progress.db"), help="SQLite progress database")
+    parser.add_argument("--inline", action="store_true", help="embed vis.js in every page for fully offline use")
+    args = parser.parse_args(argv)
+
+    try:
+        curriculum = load_curriculum(args.curriculum)
+    except CurriculumError as error:
+        print(error, file=sys.stderr)
+        return 1
+
+    manifest = export_maps(
+        curriculum,
+        read_completed(args, curriculum),
+        args.out,
+        cdn_resources="in_line" if args.inline else "remote",
+    )
+    print(f"Wrote {len(manifest['pages'])} maps of {curriculum.name} to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""Streamlit component that keeps one vis.js network alive in the browser.
+
+The first render (or any render after the browser lost track) ships the full
+node/edge payload. After that only nodes and edges whose status changed are
+sent, so the map keeps its zoom and pan and each click costs bandwidth in
+proportion to what changed. Clicking a node reports its id back to Python.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import streamlit as st
+import streamlit.components.v1 as components
+
+from world_map import payload_delta
+
+_component = components.declare_component(
+    "live_map", path=str(Path(__file__).parent / "components" / "live_map")
+)
+
+
+# Function to return the browser's newest map event once, or None when there is nothing new
+def live_map_event(key):
+    event = st.session_state.get(key)
+    nonce_key = f"{key}_nonce"
+    if not event or event.get("nonce") == st.session_state.get(nonce_key):
+        return None
+    st.session_state[nonce_key] = event["nonce"]
+    return event
+
+
+# Function to show the map; base identifies the node set (curriculum version and view),
+# and payload is the full node/edge data for the learner's current progress
+def live_map(payload, base, engine, options, key, event=None, height=750, metrics=None):
+    state_key = f"{key}_state"
+    state = st.session_state.get(state_key)
+    completed = np.packbits(engine.completed).tobytes()
+    frontier = np.packbits(engine.frontier).tobytes()
+
+    needs_full = event is not None and event.get("event") == "need_full"
+    if state is None or state["base"] != base or needs_full:
+        revision = state["revision"] + 1 if state else 0
+        args = {
+            "full": True,
+            "base": base,
+            "revision": revision,
+            "nodes": payload["nodes"],
+            "edges": payload["edges"],
+            "options": options,
+        }
+    elif state["completed"] == completed and state["frontier"] == frontier:
+        # Nothing changed; the browser only has to confirm it is up to date
+        revision = state["revision"]
+        args = {"full": False, "repeat": True, "base": base, "revision": revision}
+    else:
+        changed = np.flatnonzero(
+            np.unpackbits(np.frombuffer(state["completed"], dtype=np.uint8) ^ np.frombuffer(completed, dtype=np.uint8))
+            | np.unpackbits(np.frombuffer(state["frontier"], dtype=np.uint8) ^ np.frombuffer(frontier, dtype=np.uint8))
+        )
+        quest_ids = engine.index.quest_ids
+        delta = payload_delta(payload, engine.index, [quest_ids[i] for i in changed if i < len(quest_ids)])
+        revision = state["revision"] + 1
+        args = {
+            "full": False,
+            "base": base,
+            "revision": revision,
+            "nodes": delta["nodes"],
+            "edges": delta["edges"],
+        }
+
+    st.session_state[state_key] = {
+        "base": base,
+        "revision": revision,
+        "completed": completed,
+        "frontier": frontier,
+    }
+    if metrics is not None and metrics.enabled:
+        metrics.count("map_payload_bytes", len(json.dumps(args)))
+        metrics.count("map_full_payloads" if args["full"] else "map_delta_payloads")
+    _component(payload=args, height=height, key=key, default=None)
@@ -0,0 +1,119 @@
+"""Per-rerun timing spans and counters for the app's hot paths.
+
+A ``RerunMetrics`` is created at the top of every rerun. When it is disabled,
+``span`` hands back one shared no-op context manager and ``count`` returns
+immediately, so instrumented code pays almost nothing. When enabled, the
+finished rerun can be shown in the debug panel and written to a
+``MetricsSink`` as JSON lines or in the Prometheus text format.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
+# Returned by span() when metrics are off
+_NO_SPAN = nullcontext()
+
+FORMATS = ("jsonl", "prometheus")
+
+
+class _Span:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        self.metrics.spans[self.name] = self.metrics.spans.get(self.name, 0.0) + elapsed
+
+
+class RerunMetrics:
+    """Spans (seconds) and counters collected during one rerun."""
+
+    def __init__(self, enabled, session_id=None):
+        self.enabled = enabled
+        self.session_id = session_id
+        self.started = time.time()
+        self.spans = {}
+        self.counters = {}
+
+    def span(self, name):
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, name)
+
+    def count(self, name, value=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def as_record(self):
+        return {
+            "ts": round(self.started, 3),
+            "session": self.session_id,
+            "spans_ms": {name: round(seconds * 1000, 3) for name, seconds in self.spans.items()},
+            "counters": dict(self.counters),
+        }
+
+
+class MetricsSink:
+    """Process-wide destination for finished reruns.
+
+    ``jsonl`` appends one record per rerun. ``prometheus`` keeps cumulative
+    totals and atomically rewrites the file, for node_exporter's textfile
+    collector or any scraper that reads the exposition format.
+    """
+
+    def __init__(self, path, fmt="jsonl"):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown metrics format {fmt!r}; choose one of {', '.join(FORMATS)}")
+        self.path = Path(path)
+        self.format = fmt
+        self._lock = threading.Lock()
+        self._reruns = 0
+        self._span_totals = {}
+        self._counter_totals = {}
+
+    def record(self, metrics):
+        with self._lock:
+            if self.format == "jsonl":
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(metrics.as_record()) + "\n")
+                return
+
+            self._reruns += 1
+            for name, seconds in metrics.spans.items():
+                total, count = self._span_totals.get(name, (0.0, 0))
+                self._span_totals[name] = (total + seconds, count + 1)
+            for name, value in metrics.counters.items():
+                self._counter_totals[name] = self._counter_totals.get(name, 0) + value
+            self._write_prometheus()
+
+    def _write_prometheus(self):
+        lines = [
+            "# HELP map_reruns_total Instrumented Streamlit reruns.",
+            "# TYPE map_reruns_total counter",
+            f"map_reruns_total {self._reruns}",
+            "# HELP map_span_seconds Time spent in each rerun phase.",
+            "# TYPE map_span_seconds summary",
+        ]
+        for name, (total, count) in sorted(self._span_totals.items()):
+            lines.append(f'map_span_seconds_sum{{span="{name}"}} {total:.6f}')
+            lines.append(f'map_span_seconds_count{{span="{name}"}} {count}')
+        for name, value in sorted(self._counter_totals.items()):
+            lines.append(f"# TYPE map_{name}_total counter")
+            lines.append(f"map_{name}_total {value}")
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,67 @@
+"""Plans the shortest route of quests that unlocks a goal quest.
+
+Every quest's full set of ancestors is computed once per curriculum version and
+kept as a Python integer used as a bitset over ``QuestIndex`` positions. A plan
+is then ``ancestors & ~completed`` followed by a sort into prerequisite order,
+with no graph traversal per query.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+# Quests still to finish before ``target`` unlocks, in an order that respects prerequisites
+QuestPlan = namedtuple("QuestPlan", ["target", "steps", "estimated_hours", "xp_reward"])
+
+
+def topological_order(index):
+    # Kahn's algorithm over the index's successor rows
+    remaining = index.in_degree.copy()
+    order = np.flatnonzero(remaining == 0).tolist()
+    for position in order:
+        for successor in index.successors_of(position).tolist():
+            remaining[successor] -= 1
+            if remaining[successor] == 0:
+                order.append(successor)
+    return order
+
+
+class QuestPlanner:
+    """Answers "what do I still need to finish to unlock this quest?"."""
+
+    def __init__(self, index):
+        self.index = index
+        self._bytes = (len(index) + 7) // 8
+
+        order = topological_order(index)
+        self.rank = np.empty(len(index), dtype=np.int32)
+        self.rank[order] = np.arange(len(order), dtype=np.int32)
+
+        # Ancestors of a quest are its parents plus their ancestors; walking in
+        # topological order means every parent is finished before its children
+        self.ancestors = [0] * len(index)
+        for position in order:
+            inherited = self.ancestors[position] | (1 << position)
+            for successor in index.successors_of(position).tolist():
+                self.ancestors[successor] |= inherited
+
+    def completed_bits(self, engine):
+        return int.from_bytes(np.packbits(engine.completed, bitorder="little").tobytes(), "little")
+
+    def plan(self, quest_id, engine):
+        """Return the ``QuestPlan`` for reaching ``quest_id`` from ``engine``'s progress."""
+        missing = self.ancestors[self.index.positions[quest_id]] & ~self.completed_bits(engine)
+        positions = np.flatnonzero(
+            np.unpackbits(
+                np.frombuffer(missing.to_bytes(self._bytes, "little"), dtype=np.uint8),
+                count=len(self.index),
+                bitorder="little",
+            )
+        )
+        positions = positions[np.argsort(self.rank[positions])]
+        return QuestPlan(
+            target=quest_id,
+            steps=[self.index.quest_ids[i] for i in positions],
+            estimated_hours=float(self.index.estimated_hours[positions].sum()),
+            xp_reward=int(self.index.xp_rewards[positions].sum()),
+        )
@@ -0,0 +1,261 @@
+"""Durable storage for learner progress.
+
+Stores implement ``load`` and ``save`` for one learner in one curriculum.
+``SQLiteProgressStore`` keeps a small per-process connection pool in WAL mode
+and coalesces saves in a background writer, so a burst of "Complete Quest"
+clicks from many learners becomes one short transaction.
+"""
+
+import atexit
+import json
+import queue
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from contextlib import contextmanager
+
+# What gets persisted for one learner in one curriculum
+ProgressRecord = namedtuple("ProgressRecord", ["completed", "total_xp", "current_level"])
+
+
+class ProgressStore(ABC):
+    """Interface every progress backend implements."""
+
+    @abstractmethod
+    def load(self, learner_id, curriculum_id):
+        """Return the learner's ProgressRecord, or None when nothing is stored yet."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def save(self, learner_id, curriculum_id, record):
+        raise NotImplementedError
+
+    @abstractmethod
+    def load_all(self, curriculum_id):
+        """Return {learner_id: ProgressRecord} for every learner of the curriculum."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def revision(self, curriculum_id):
+        """Return a value that changes whenever progress in the curriculum changes."""
+        raise NotImplementedError
+
+    def flush(self, timeout=10):
+        """Block until every accepted save is durable; returns False on timeout."""
+        return True
+
+    def close(self):
+        self.flush()
+
+
+class MemoryProgressStore(ProgressStore):
+    """Keeps progress in process memory; useful for tests and throwaway deployments."""
+
+    def __init__(self):
+        self._records = {}
+        self._revisions = {}
+        self._lock = threading.Lock()
+
+    def load(self, learner_id, curriculum_id):
+        with self._lock:
+            return self._records.get((learner_id, curriculum_id))
+
+    def save(self, learner_id, curriculum_id, record):
+        with self._lock:
+            self._records[(learner_id, curriculum_id)] = record
+            self._revisions[curriculum_id] = self._revisions.get(curriculum_id, 0) + 1
+
+    def load_all(self, curriculum_id):
+        with self._lock:
+            return {
+                learner_id: record
+                for (learner_id, record_curriculum), record in self._records.items()
+                if record_curriculum == curriculum_id
+            }
+
+    def revision(self, curriculum_id):
+        with self._lock:
+            return self._revisions.get(curriculum_id, 0)
+
+
+class SQLiteProgressStore(ProgressStore):
+    """SQLite backend with pooled WAL connections and coalesced, batched writes."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS progress (
+            learner_id TEXT NOT NULL,
+            curriculum_id TEXT NOT NULL,
+            completed TEXT NOT NULL,
+            total_xp INTEGER NOT NULL,
+            current_level INTEGER NOT NULL,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (learner_id, curriculum_id)
+        )
+    """
+
+    UPSERT = """
+        INSERT INTO progress (learner_id, curriculum_id, completed, total_xp, current_level, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (learner_id, curriculum_id) DO UPDATE SET
+            completed = excluded.completed,
+            total_xp = excluded.total_xp,
+            current_level = excluded.current_level,
+            updated_at = excluded.updated_at
+    """
+
+    def __init__(self, path, pool_size=4, flush_interval=0.25, batch_size=500):
+        self.path = str(path)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._pool = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+        with self.connection() as conn:
+            conn.execute(self.SCHEMA)
+
+        # Latest unsaved record per learner; later saves overwrite earlier ones
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flushed = threading.Condition(self._pending_lock)
+        self._in_flight = False
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="progress-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def load(self, learner_id, curriculum_id):
+        key = (learner_id, curriculum_id)
+        with self._pending_lock:
+            if key in self._pending:
+                return self._pending[key]
+
+        with self.connection() as conn:
+            row = conn.execute(
+                "SELECT completed, total_xp, current_level FROM progress "
+                "WHERE learner_id = ? AND curriculum_id = ?",
+                key,
+            ).fetchone()
+        if row is None:
+            return None
+        return ProgressRecord(json.loads(row[0]), row[1], row[2])
+
+    def save(self, learner_id, curriculum_id, record):
+        with self._pending_lock:
+            if self._closed:
+                raise RuntimeError("progress store is closed")
+            self._pending[(learner_id, curriculum_id)] = record
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def load_all(self, curriculum_id):
+        with self.connection() as conn:
+            rows = conn.execute(
+                "SELECT learner_id, completed, total_xp, current_level FROM progress WHERE curriculum_id = ?",
+                (curriculum_id,),
+            ).fetchall()
+        records = {row[0]: ProgressRecord(json.loads(row[1]), row[2], row[3]) for row in rows}
+
+        # Saves still waiting for the writer are newer than what is on disk
+        with self._pending_lock:
+            for (learner_id, record_curriculum), record in self._pending.items():
+                if record_curriculum == curriculum_id:
+                    records[learner_id] = record
+        return records
+
+    def revision(self, curriculum_id):
+        # Row count and newest write cover saves from every process sharing the database
+        with self.connection() as conn:
+            return tuple(conn.execute(
+                "SELECT COUNT(*), MAX(updated_at) FROM progress WHERE curriculum_id = ?", (curriculum_id,)
+            ).fetchone())
+
+    def flush(self, timeout=10):
+        deadline = time.monotonic() + timeout
+        with self._pending_lock:
+            while (self._pending or self._in_flight) and self._writer.is_alive():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._wake.set()
+                self._flushed.wait(timeout=min(remaining, 1))
+        return True
+
+    def close(self):
+        self.flush()
+        with self._pending_lock:
+            self._closed = True
+        self._wake.set()
+        self._writer.join(timeout=5)
+
+    def _write_loop(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            with self._pending_lock:
+                batch = self._pending
+                self._pending = {}
+                self._in_flight = bool(batch)
+                closed = self._closed
+            if batch:
+                self._write_batch(batch)
+            with self._pending_lock:
+                self._in_flight = False
+                self._flushed.notify_all()
+            if closed:
+                return
+
+    def _write_batch(self, batch):
+        now = time.time()
+        rows = [
+            (learner_id, curriculum_id, json.dumps(sorted(record.completed)),
+             record.total_xp, record.current_level, now)
+            for (learner_id, curriculum_id), record in batch.items()
+        ]
+        try:
+            with self.connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.executemany(self.UPSERT, rows)
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error:
+            # Put the batch back (without clobbering newer saves) and retry on the next tick
+            with self._pending_lock:
+                for key, record in batch.items():
+                    self._pending.setdefault(key, record)
+
+
+# Available backends, by the name used in configuration
+BACKENDS = {
+    "sqlite": SQLiteProgressStore,
+    "memory": MemoryProgressStore,
+}
+
+
+def create_progress_store(backend, **options):
+    try:
+        store_class = BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown progress backend {backend!r}; choose one of {', '.join(BACKENDS)}") from None
+    return store_class(**options)
@@ -0,0 +1,263 @@
+"""Per-learner quest availability, completion and XP tracking for the learning map.
+
+Nothing here depends on Streamlit, so the app, the JSON API and offline tools
+share the same rules.
+"""
+
+import hashlib
+from collections import namedtuple
+
+import numpy as np
+
+from progress_store import ProgressRecord
+
+# Quest status values
+COMPLETED = "completed"
+AVAILABLE = "available"
+LOCKED = "locked"
+
+# Extra outcomes of LearnerProgress.complete()
+ALREADY_COMPLETED = "already_completed"
+UNKNOWN = "unknown"
+
+# XP needed to go up one level
+XP_PER_LEVEL = 1000
+
+# What happened when a learner tried to complete a quest
+CompletionResult = namedtuple(
+    "CompletionResult", ["quest_id", "status", "xp_gained", "total_xp", "level", "leveled_up"]
+)
+
+# One zone's line in the progress overview
+ZoneProgress = namedtuple("ZoneProgress", ["zone", "completed", "total", "available"])
+
+
+def level_for_xp(total_xp):
+    return total_xp // XP_PER_LEVEL + 1
+
+
+class QuestIndex:
+    """Fixed integer ordering of a curriculum's quests, shared by every learner.
+
+    Progress is stored as boolean arrays laid out in this order, so zone and
+    completion statistics become single vectorized operations.
+    """
+
+    def __init__(self, graph):
+        self.quest_ids = tuple(graph.nodes())
+        self.positions = {quest_id: i for i, quest_id in enumerate(self.quest_ids)}
+
+        # Zone membership: one code per quest plus a boolean mask per zone
+        self.zones = tuple(sorted({graph.nodes[quest_id]['zone'] for quest_id in self.quest_ids}))
+        zone_positions = {zone: i for i, zone in enumerate(self.zones)}
+        self.zone_codes = np.array(
+            [zone_positions[graph.nodes[quest_id]['zone']] for quest_id in self.quest_ids],
+            dtype=np.int32,
+        )
+        self.zone_masks = self.zone_codes[np.newaxis, :] == np.arange(len(self.zones))[:, np.newaxis]
+        self.zone_sizes = np.bincount(self.zone_codes, minlength=len(self.zones))
+
+        # Per-quest attributes in parallel arrays
+        self.xp_rewards = np.array([graph.nodes[quest_id]['xp_reward'] for quest_id in self.quest_ids], dtype=np.int64)
+        self.estimated_hours = np.array(
+            [graph.nodes[quest_id]['estimated_hours'] for quest_id in self.quest_ids], dtype=np.float64
+        )
+
+        # Prerequisite structure as compressed sparse rows: the neighbours of
+        # quest i are indices[indptr[i]:indptr[i + 1]]
+        self.successor_indptr, self.successor_indices = self._compress(graph.successors)
+        self.predecessor_indptr, self.predecessor_indices = self._compress(graph.predecessors)
+        self.in_degree = np.diff(self.predecessor_indptr).astype(np.int32)
+
+    def _compress(self, neighbours):
+        rows = [[self.positions[neighbour] for neighbour in neighbours(quest_id)] for quest_id in self.quest_ids]
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(row) for row in rows], out=indptr[1:])
+        indices = np.fromiter((i for row in rows for i in row), dtype=np.int32, count=int(indptr[-1]))
+        return indptr, indices
+
+    def __len__(self):
+        return len(self.quest_ids)
+
+    def successors_of(self, position):
+        return self.successor_indices[self.successor_indptr[position]:self.successor_indptr[position + 1]]
+
+    def predecessors_of(self, position):
+        return self.predecessor_indices[self.predecessor_indptr[position]:self.predecessor_indptr[position + 1]]
+
+    def prerequisites(self, quest_id):
+        return [self.quest_ids[i] for i in self.predecessors_of(self.positions[quest_id])]
+
+    def dependents(self, quest_id):
+        return [self.quest_ids[i] for i in self.successors_of(self.positions[quest_id])]
+
+    def zone_position(self, zone):
+        return self.zones.index(zone)
+
+    def ids(self, mask):
+        return [self.quest_ids[i] for i in np.flatnonzero(mask)]
+
+
+class AvailabilityEngine:
+    """Keeps one learner's completed quests and the frontier of quests they can start.
+
+    Every quest carries a counter of prerequisites that are not completed yet.
+    Completing a quest only touches its direct successors, and every status
+    lookup is an array read.
+    """
+
+    def __init__(self, index, completed_quests=()):
+        self.index = index
+        self.availability_checks = 0  # Read by the debug metrics
+        self.reset(completed_quests)
+
+    def reset(self, completed_quests=()):
+        self.completed = np.zeros(len(self.index), dtype=bool)
+        self.unmet = self.index.in_degree.copy()
+        self.frontier = self.unmet == 0
+        for quest_id in completed_quests:
+            self.complete(quest_id)
+
+    def to_bytes(self):
+        return np.packbits(self.completed).tobytes()
+
+    def progress_key(self):
+        # Stable hash of the completion bitset, used to share cached renders
+        return hashlib.sha256(self.to_bytes()).hexdigest()
+
+    def complete(self, quest_id):
+        # Returns False when the quest was already completed
+        position = self.index.positions[quest_id]
+        if self.completed[position]:
+            return False
+
+        self.completed[position] = True
+        self.frontier[position] = False
+        successors = self.index.successors_of(position)
+        self.unmet[successors] -= 1
+        self.frontier[successors] |= (self.unmet[successors] == 0) & ~self.completed[successors]
+        return True
+
+    def is_completed(self, quest_id):
+        return bool(self.completed[self.index.positions[quest_id]])
+
+    def is_available(self, quest_id):
+        self.availability_checks += 1
+        return bool(self.frontier[self.index.positions[quest_id]])
+
+    def is_locked(self, quest_id):
+        position = self.index.positions[quest_id]
+        return not (self.completed[position] or self.frontier[position])
+
+    def status(self, quest_id):
+        position = self.index.positions[quest_id]
+        if self.completed[position]:
+            return COMPLETED
+        if self.frontier[position]:
+            return AVAILABLE
+        return LOCKED
+
+    def completed_quests(self, zone=None):
+        return self.index.ids(self._in_zone(self.completed, zone))
+
+    def available_quests(self, zone=None):
+        return self.index.ids(self._in_zone(self.frontier, zone))
+
+    def unlocked_quests(self, zone=None):
+        # Completed or available quests, in curriculum order
+        return self.index.ids(self._in_zone(self.completed | self.frontier, zone))
+
+    def completed_count(self):
+        return int(np.count_nonzero(self.completed))
+
+    def completion_rate(self):
+        return float(self.completed.mean()) if len(self.index) else 0.0
+
+    def zone_completed_counts(self):
+        return np.bincount(self.index.zone_codes, weights=self.completed, minlength=len(self.index.zones)).astype(int)
+
+    def zone_available_counts(self):
+        return np.bincount(self.index.zone_codes, weights=self.frontier, minlength=len(self.index.zones)).astype(int)
+
+    def _in_zone(self, mask, zone):
+        if zone is None:
+            return mask
+        return mask & self.index.zone_masks[self.index.zone_position(zone)]
+
+
+class LearnerProgress:
+    """A learner's quest engine together with the XP and level they have earned."""
+
+    def __init__(self, engine, total_xp=0, current_level=1):
+        self.engine = engine
+        self.total_xp = total_xp
+        self.current_level = current_level
+
+    @classmethod
+    def start(cls, index, starting_quests=()):
+        return cls(AvailabilityEngine(index, starting_quests))
+
+    @classmethod
+    def from_record(cls, index, record):
+        # Completions of quests the curriculum no longer has are dropped
+        completed = [quest_id for quest_id in record.completed if quest_id in index.positions]
+        return cls(AvailabilityEngine(index, completed), record.total_xp, record.current_level)
+
+    def to_record(self):
+        return ProgressRecord(self.engine.completed_quests(), self.total_xp, self.current_level)
+
+    def with_index(self, index):
+        # The same progress on a reloaded curriculum
+        return LearnerProgress.from_record(index, self.to_record())
+
+    def complete(self, quest_id):
+        """Complete an available quest and award its XP; returns a ``CompletionResult``."""
+        index = self.engine.index
+        if quest_id not in index.positions:
+            status = UNKNOWN
+        elif self.engine.is_completed(quest_id):
+            status = ALREADY_COMPLETED
+        elif self.engine.is_locked(quest_id):
+            status = LOCKED
+        else:
+            status = COMPLETED
+        if status != COMPLETED:
+            return CompletionResult(quest_id, status, 0, self.total_xp, self.current_level, False)
+
+        self.engine.complete(quest_id)
+        xp_gained = int(index.xp_rewards[index.positions[quest_id]])
+        self.total_xp += xp_gained
+
+        # Levels only go up
+        new_level = level_for_xp(self.total_xp)
+        leveled_up = new_level > self.current_level
+        if leveled_up:
+            self.current_level = new_level
+        return CompletionResult(quest_id, COMPLETED, xp_gained, self.total_xp, self.current_level, leveled_up)
+
+    def reset(self, starting_quests=()):
+        self.engine.reset(starting_quests)
+        self.total_xp = 0
+        self.current_level = 1
+
+    def xp_to_next_level(self):
+        return self.current_level * XP_PER_LEVEL - self.total_xp
+
+    def level_progress(self):
+        # Fraction of the current level's XP already earned
+        return (self.total_xp % XP_PER_LEVEL) / XP_PER_LEVEL
+
+    def zone_progress(self):
+        """Return a ``ZoneProgress`` per zone, with the zone's available quests."""
+        index = self.engine.index
+        completed = self.engine.zone_completed_counts()
+        available = self.engine.zone_available_counts()
+        return [
+            ZoneProgress(
+                zone,
+                int(completed[position]),
+                int(index.zone_sizes[position]),
+                self.engine.available_quests(zone) if available[position] else [],
+            )
+            for position, zone in enumerate(index.zones)
+        ]
@@ -0,0 +1,97 @@
+"""Ranks a learner's available quests by what completing them is worth.
+
+Per-curriculum data (descendant counts, XP per hour and the prerequisite edges
+as flat arrays) is computed once. Scoring a learner is a handful of numpy
+operations over the whole frontier, so it can run on every rerun.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from planner import topological_order
+
+# How much each signal counts towards a recommendation's score
+SCORE_WEIGHTS = {
+    "xp_per_hour": 1.0,
+    "unlocks": 1.5,
+    "downstream": 1.0,
+    "zone_balance": 0.75,
+}
+
+Recommendation = namedtuple(
+    "Recommendation",
+    ["quest_id", "score", "xp_per_hour", "unlocks", "closer", "downstream", "zone_completion"],
+)
+
+
+def _normalized(values):
+    top = values.max() if len(values) else 0
+    return values / top if top > 0 else np.zeros(len(values))
+
+
+class QuestRecommender:
+    """Scores frontier quests on XP per hour, downstream value and zone balance.
+
+    ``unlocks`` counts successors that become available right away,
+    ``closer`` counts locked successors that lose one missing prerequisite,
+    and ``downstream`` is the number of quests that depend on the quest at any
+    distance. Zones the learner has done least of score higher.
+    """
+
+    def __init__(self, index):
+        self.index = index
+
+        hours = index.estimated_hours
+        xp = index.xp_rewards.astype(float)
+        self.xp_per_hour = np.divide(xp, hours, out=xp.copy(), where=hours > 0)
+
+        # Descendant sets as integer bitsets, filled in reverse topological order
+        descendants = [0] * len(index)
+        for position in reversed(topological_order(index)):
+            for successor in index.successors_of(position).tolist():
+                descendants[position] |= descendants[successor] | (1 << successor)
+        self.downstream = np.array([bin(bits).count("1") for bits in descendants], dtype=np.int64)
+
+        # Prerequisite edges as two parallel arrays, for per-learner bincounts
+        self.edge_sources = np.repeat(np.arange(len(index), dtype=np.int32), np.diff(index.successor_indptr))
+        self.edge_targets = index.successor_indices
+
+    def recommend(self, engine, limit=5):
+        """Return up to ``limit`` ``Recommendation``s for the learner, best first."""
+        frontier = np.flatnonzero(engine.frontier)
+        if not len(frontier):
+            return []
+
+        size = len(self.index)
+        open_targets = ~engine.completed[self.edge_targets]
+        unlocks = np.bincount(
+            self.edge_sources,
+            weights=open_targets & (engine.unmet[self.edge_targets] == 1),
+            minlength=size,
+        )[frontier]
+        closer = np.bincount(self.edge_sources, weights=open_targets, minlength=size)[frontier] - unlocks
+
+        zone_rates = engine.zone_completed_counts() / np.maximum(self.index.zone_sizes, 1)
+        zone_completion = zone_rates[self.index.zone_codes[frontier]]
+
+        scores = (
+            SCORE_WEIGHTS["xp_per_hour"] * _normalized(self.xp_per_hour[frontier])
+            + SCORE_WEIGHTS["unlocks"] * _normalized(unlocks + 0.5 * closer)
+            + SCORE_WEIGHTS["downstream"] * _normalized(np.log1p(self.downstream[frontier]))
+            + SCORE_WEIGHTS["zone_balance"] * (1.0 - zone_completion)
+        )
+
+        best = np.argsort(-scores, kind="stable")[:limit]
+        return [
+            Recommendation(
+                quest_id=self.index.quest_ids[frontier[i]],
+                score=float(scores[i]),
+                xp_per_hour=float(self.xp_per_hour[frontier[i]]),
+                unlocks=int(unlocks[i]),
+                closer=int(closer[i]),
+                downstream=int(self.downstream[frontier[i]]),
+                zone_completion=float(zone_completion[i]),
+            )
+            for i in best
+        ]
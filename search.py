@@ -0,0 +1,122 @@
+"""Inverted-index search over the text of a curriculum's quests.
+
+The index is built once per curriculum version. Terms are kept sorted and
+their postings are laid out back to back, so every term that starts with a
+query prefix is one contiguous slice of the postings arrays and a whole query
+is answered with a few ``bisect`` calls and ``np.bincount``.
+"""
+
+import bisect
+import re
+
+import numpy as np
+
+from quest_engine import AVAILABLE, COMPLETED, LOCKED
+
+# Fields that are searched, and how much a match in each one counts
+FIELD_WEIGHTS = {
+    "title": 4.0,
+    "topics": 2.0,
+    "resources": 1.0,
+    "description": 1.0,
+}
+
+STATUSES = (AVAILABLE, COMPLETED, LOCKED)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+
+def _field_text(value):
+    return " ".join(value) if isinstance(value, (list, tuple)) else str(value)
+
+
+class QuestSearchIndex:
+    """Prefix search over quest titles, descriptions, topics and resources.
+
+    Every query word must match the start of some word in the quest. Results
+    are ranked by where the words matched (titles count most) and then by
+    curriculum order.
+    """
+
+    def __init__(self, quests, index):
+        self.index = index
+
+        # term -> {quest position: weight}, counting each field once per term
+        postings = {}
+        for position, quest_id in enumerate(index.quest_ids):
+            quest = quests[quest_id]
+            for field, weight in FIELD_WEIGHTS.items():
+                for term in set(tokenize(_field_text(getattr(quest, field)))):
+                    weights = postings.setdefault(term, {})
+                    weights[position] = weights.get(position, 0.0) + weight
+
+        self.terms = sorted(postings)
+        sizes = [len(postings[term]) for term in self.terms]
+        self.term_starts = np.zeros(len(self.terms) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=self.term_starts[1:])
+        self.positions = np.fromiter(
+            (position for term in self.terms for position in postings[term]),
+            dtype=np.int32,
+            count=int(self.term_starts[-1]),
+        )
+        self.weights = np.fromiter(
+            (weight for term in self.terms for weight in postings[term].values()),
+            dtype=np.float64,
+            count=int(self.term_starts[-1]),
+        )
+
+        # Difficulty filter, laid out like the zone masks of the quest index
+        self.difficulties = tuple(sorted({quests[quest_id].difficulty for quest_id in index.quest_ids}))
+        difficulty_positions = {difficulty: i for i, difficulty in enumerate(self.difficulties)}
+        self.difficulty_codes = np.array(
+            [difficulty_positions[quests[quest_id].difficulty] for quest_id in index.quest_ids],
+            dtype=np.int32,
+        )
+
+    def _prefix_scores(self, prefix):
+        # Every term starting with the prefix sits in one run of the sorted term list
+        lo = bisect.bisect_left(self.terms, prefix)
+        hi = bisect.bisect_left(self.terms, prefix + "\uffff", lo)
+        start, end = self.term_starts[lo], self.term_starts[hi]
+        return np.bincount(self.positions[start:end], weights=self.weights[start:end], minlength=len(self.index))
+
+    def search(self, query, zone=None, difficulty=None, status=None, engine=None, limit=None):
+        """Return matching quest ids, best first.
+
+        An empty query matches every quest, so the filters alone can be used
+        to list quests. ``status`` needs the learner's ``engine``.
+        """
+        scores = np.zeros(len(self.index))
+        matched = np.ones(len(self.index), dtype=bool)
+        for word in tokenize(query):
+            word_scores = self._prefix_scores(word)
+            matched &= word_scores > 0
+            scores += word_scores
+
+        if zone is not None:
+            matched &= self.index.zone_masks[self.index.zone_position(zone)]
+        if difficulty is not None:
+            if difficulty in self.difficulties:
+                matched &= self.difficulty_codes == self.difficulties.index(difficulty)
+            else:
+                matched[:] = False
+        if status is not None:
+            if status == COMPLETED:
+                matched &= engine.completed
+            elif status == AVAILABLE:
+                matched &= engine.frontier
+            elif status == LOCKED:
+                matched &= ~(engine.completed | engine.frontier)
+            else:
+                raise ValueError(f"Unknown quest status {status!r}; choose one of {', '.join(STATUSES)}")
+
+        hits = np.flatnonzero(matched)
+        # Stable sort keeps curriculum order among equally good matches
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        if limit is not None:
+            hits = hits[:limit]
+        return [self.index.quest_ids[i] for i in hits]
@@ -0,0 +1,388 @@
+"""Building the vis.js world map from a curriculum's quest index and a learner's progress.
+
+Nodes and edges are written straight into vis.js dicts, laid out exactly as
+pyvis would write them, so building a map is linear in its size. Only
+``MapNetwork.generate_html`` needs jinja2, to render pyvis' page template.
+"""
+
+import importlib.util
+import json
+import os
+
+import numpy as np
+
+# Layout spacing, in vis.js canvas units
+LEVEL_SEPARATION = 100
+NODE_SPACING = 150
+ZONE_SPACING = 200
+
+# Status colours
+COMPLETED_COLOR = "#808080"
+LOCKED_COLOR = "#D3D3D3"
+ACTIVE_EDGE_COLOR = "#2E7D32"
+CLUSTER_COLOR = "#90A4AE"
+
+# Map views
+VIEW_ALL = "all"
+VIEW_ZONE = "zone"
+VIEW_FRONTIER = "frontier"
+
+# Prefix for the ids of collapsed zone nodes
+CLUSTER_PREFIX = "zone::"
+
+# vis.js options; node positions come from compute_layout, so client-side layout is off
+MAP_OPTIONS = """
+{
+    "nodes": {
+        "shape": "hexagon",
+        "shadow": true,
+        "font": {
+            "size": 14,
+            "face": "Roboto"
+        },
+        "scaling": {
+            "label": {
+                "enabled": true,
+                "min": 8,
+                "max": 20
+            }
+        }
+    },
+    "edges": {
+        "color": {
+            "inherit": false
+        },
+        "arrows": {
+            "to": {
+                "enabled": true,
+                "scaleFactor": 0.5
+            }
+        },
+        "smooth": {
+            "type": "continuous",
+            "roundness": 0.5
+        }
+    },
+    "layout": {
+        "improvedLayout": false,
+        "hierarchical": {
+            "enabled": false
+        }
+    },
+    "interaction": {
+        "dragNodes": true,
+        "dragView": true,
+        "zoomView": true,
+        "hover": true,
+        "multiselect": false,
+        "navigationButtons": true
+    },
+    "physics": {
+        "enabled": false
+    }
+}
+"""
+MAP_OPTIONS_DATA = json.loads(MAP_OPTIONS)
+
+# Serialized once: every page embeds the same vis.js options
+MAP_OPTIONS_JSON = json.dumps(MAP_OPTIONS_DATA)
+
+# jinja environment over pyvis' page templates, created on first use so the
+# template is compiled once per process
+_template_env = None
+
+
+def _page_template():
+    global _template_env
+    if _template_env is None:
+        from jinja2 import Environment, FileSystemLoader
+
+        pyvis_dir = importlib.util.find_spec("pyvis").submodule_search_locations[0]
+        _template_env = Environment(loader=FileSystemLoader(os.path.join(pyvis_dir, "templates")))
+    return _template_env.get_template("template.html")
+
+
+class MapNetwork:
+    """The part of pyvis' ``Network`` the map uses, without its linear duplicate scans.
+
+    Node and edge dicts have the same keys, in the same order, as pyvis
+    writes them, and ``generate_html`` renders pyvis' own template, so pages
+    come out identical.
+    """
+
+    def __init__(self, height="750px", width="100%", bgcolor="#ffffff", font_color="black", cdn_resources="remote"):
+        if cdn_resources not in ("local", "in_line", "remote"):
+            raise ValueError(f"cdn_resources must be 'local', 'in_line' or 'remote', not {cdn_resources!r}")
+        self.height = height
+        self.width = width
+        self.bgcolor = bgcolor
+        self.font_color = font_color
+        self.cdn_resources = cdn_resources
+        self.nodes = []
+        self.edges = []
+        self._node_ids = set()
+        self._edge_ends = set()
+
+    def add_node(self, node_id, label=None, shape="dot", color="#97c2fc", **options):
+        if node_id in self._node_ids:
+            return
+        node = dict(color=color, **options, id=node_id, label=label or node_id, shape=shape)
+        if self.font_color:
+            node["font"] = {"color": self.font_color}
+        self.nodes.append(node)
+        self._node_ids.add(node_id)
+
+    def add_edge(self, source, target, **options):
+        # Undirected duplicate check, as in pyvis
+        if (source, target) in self._edge_ends or (target, source) in self._edge_ends:
+            return
+        self.edges.append(dict(options, **{"from": source, "to": target}))
+        self._edge_ends.add((source, target))
+
+    def generate_html(self):
+        return _page_template().render(
+            height=self.height,
+            width=self.width,
+            nodes=self.nodes,
+            edges=self.edges,
+            heading="",
+            options=MAP_OPTIONS_JSON,
+            physics_enabled=MAP_OPTIONS_DATA["physics"]["enabled"],
+            use_DOT=False,
+            dot_lang="",
+            widget=False,
+            bgcolor=self.bgcolor,
+            conf=False,
+            tooltip_link=any("href" in node.get("title", "") for node in self.nodes),
+            neighborhood_highlight=False,
+            select_menu=False,
+            filter_menu=False,
+            notebook=False,
+            cdn_resources=self.cdn_resources,
+        )
+
+
+# Function to place every quest on a fixed grid: one row per topological
+# generation, quests of the same zone kept side by side within a row
+def compute_layout(index):
+    # Topological generations by peeling off quests whose prerequisites are all placed
+    in_degree = index.in_degree.copy()
+    generations = []
+    ring = np.flatnonzero(in_degree == 0)
+    while len(ring):
+        generations.append(ring.tolist())
+        targets = np.concatenate([index.successors_of(position) for position in ring])
+        np.subtract.at(in_degree, targets, 1)
+        ring = np.unique(targets[in_degree[targets] == 0])
+
+    # Zones are ranked by the first row they appear in
+    zone_codes = index.zone_codes.tolist()
+    zone_rank = {}
+    for generation in generations:
+        for position in generation:
+            zone_rank.setdefault(zone_codes[position], len(zone_rank))
+
+    xs_by_position = {}
+    positions = {}
+    for depth, generation in enumerate(generations):
+        # Within a zone, sit each quest under the average of its prerequisites to reduce crossings
+        def row_key(position):
+            parents = [xs_by_position[parent] for parent in index.predecessors_of(position).tolist()]
+            anchor = sum(parents) / len(parents) if parents else 0
+            return zone_rank[zone_codes[position]], anchor, position
+
+        row = sorted(generation, key=row_key)
+        xs = []
+        x = 0
+        for i, position in enumerate(row):
+            if i:
+                same_zone = zone_codes[position] == zone_codes[row[i - 1]]
+                x += NODE_SPACING if same_zone else NODE_SPACING + ZONE_SPACING
+            xs.append(x)
+
+        # Centre each row on x = 0
+        offset = xs[-1] / 2
+        for position, x in zip(row, xs):
+            xs_by_position[position] = round(x - offset)
+            positions[index.quest_ids[position]] = (xs_by_position[position], depth * LEVEL_SEPARATION)
+
+    return positions
+
+
+# Function to pick the quests shown in a zone-focused view, in curriculum order
+def zone_subgraph(engine, zone):
+    index = engine.index
+    return index.ids(index.zone_masks[index.zone_position(zone)])
+
+
+# Function to pick the quests within k hops (either direction) of the learner's frontier
+def frontier_subgraph(engine, hops):
+    index = engine.index
+    reached = engine.frontier.copy()
+    ring = np.flatnonzero(reached)
+    for _ in range(hops):
+        if not len(ring):
+            break
+        neighbours = np.concatenate(
+            [index.predecessors_of(position) for position in ring]
+            + [index.successors_of(position) for position in ring]
+        )
+        ring = np.unique(neighbours[~reached[neighbours]])
+        reached[ring] = True
+    return index.ids(reached)
+
+
+# Function to get quest status color
+def quest_status_color(engine, quest_id, base_color):
+    if engine.is_completed(quest_id):
+        return COMPLETED_COLOR  # Completed (gray)
+    elif engine.is_available(quest_id):
+        return base_color  # Available (original color)
+    else:
+        return LOCKED_COLOR  # Locked (light gray)
+
+
+# Function to build the map network for one learner's progress; when only
+# some quests are visible, the rest of each zone collapses into one cluster node.
+# cdn_resources only matters for generate_html() ("in_line" embeds vis.js for offline pages)
+def build_network(quests, engine, layout, visible=None, cdn_resources="remote"):
+    index = engine.index
+    net = MapNetwork(cdn_resources=cdn_resources)
+
+    shown = index.quest_ids if visible is None else visible
+
+    # Add nodes and edges with improved visibility
+    for node_id in shown:
+        add_quest_node(net, node_id, quests[node_id], engine, layout[node_id])
+
+    if visible is None:
+        for source, node_id in enumerate(index.quest_ids):
+            for target in index.successors_of(source).tolist():
+                add_quest_edge(net, engine, node_id, index.quest_ids[target])
+        return net
+
+    visible = set(visible)
+    cluster_edges = set()
+    for node_id in shown:
+        for target in index.dependents(node_id):
+            if target in visible:
+                add_quest_edge(net, engine, node_id, target)
+            else:
+                cluster_edges.add((node_id, CLUSTER_PREFIX + quests[target].zone))
+        for source in index.prerequisites(node_id):
+            if source not in visible:
+                cluster_edges.add((CLUSTER_PREFIX + quests[source].zone, node_id))
+
+    add_zone_clusters(net, engine, layout, visible, shown)
+    for source, target in sorted(cluster_edges):
+        net.add_edge(source, target, color=LOCKED_COLOR, width=1, dashes=True)
+
+    return net
+
+
+# Function to extract the vis.js node/edge data from a built network; edges get
+# stable ids so the browser can patch them in place
+def network_payload(net):
+    edges = [dict(edge, id=f"{edge['from']}->{edge['to']}") for edge in net.edges]
+    return {"nodes": net.nodes, "edges": edges}
+
+
+# Function to pick the part of a payload affected by status changes of some quests:
+# the quests themselves, their prerequisite edges and every zone cluster node
+def payload_delta(payload, index, changed_quests):
+    nodes_by_id = {node["id"]: node for node in payload["nodes"]}
+    edges_by_id = {edge["id"]: edge for edge in payload["edges"]}
+
+    nodes = [nodes_by_id[quest_id] for quest_id in changed_quests if quest_id in nodes_by_id]
+    nodes += [node for node_id, node in nodes_by_id.items() if str(node_id).startswith(CLUSTER_PREFIX)]
+
+    edge_ids = set()
+    for quest_id in changed_quests:
+        edge_ids.update(f"{source}->{quest_id}" for source in index.prerequisites(quest_id))
+        edge_ids.update(f"{quest_id}->{target}" for target in index.dependents(quest_id))
+    edges = [edges_by_id[edge_id] for edge_id in edge_ids if edge_id in edges_by_id]
+
+    return {"nodes": nodes, "edges": edges}
+
+
+# Function to add one quest node
+def add_quest_node(net, node_id, quest, engine, position):
+    x, y = position
+
+    # Determine node status
+    is_completed = engine.is_completed(node_id)
+    is_available = engine.is_available(node_id)
+
+    # Create status indicator
+    status_icon = "✅ " if is_completed else "🔓 " if is_available else "🔒 "
+
+    # Create tooltip with more info
+    tooltip = f"""
+    {status_icon}{quest.title}
+
+    Difficulty: {quest.difficulty}
+    XP Reward: {quest.xp_reward}
+    Time: ~{quest.estimated_hours} hours
+
+    Click to view in Quest Details tab!
+    """
+
+    # Add node with modified appearance at its precomputed position
+    net.add_node(
+        node_id,
+        label=f"{quest.title}",
+        title=tooltip,
+        color=quest_status_color(engine, node_id, quest.color),
+        borderWidth=3 if is_available else 1,
+        borderWidthSelected=4,
+        size=30 if is_completed or is_available else 25,
+        x=x,
+        y=y,
+    )
+
+
+# Function to add one prerequisite edge
+def add_quest_edge(net, engine, source, target):
+    is_active = engine.is_completed(source) and engine.is_available(target)
+
+    net.add_edge(
+        source,
+        target,
+        color=ACTIVE_EDGE_COLOR if is_active else LOCKED_COLOR,
+        width=2 if is_active else 1,
+        smooth={'type': 'curvedCW', 'roundness': 0.2}
+    )
+
+
+# Function to add one aggregate node per zone that is not fully visible,
+# laid out in a row above the visible quests
+def add_zone_clusters(net, engine, layout, visible, quests):
+    index = engine.index
+    completed = engine.zone_completed_counts()
+    visible_counts = {}
+    for node_id in quests:
+        zone_code = index.zone_codes[index.positions[node_id]]
+        visible_counts[zone_code] = visible_counts.get(zone_code, 0) + 1
+
+    clusters = [
+        zone_code for zone_code in range(len(index.zones))
+        if visible_counts.get(zone_code, 0) < index.zone_sizes[zone_code]
+    ]
+    top = min((layout[node_id][1] for node_id in quests), default=0) - 2 * LEVEL_SEPARATION
+    width = (len(clusters) - 1) * (NODE_SPACING + ZONE_SPACING)
+
+    for i, zone_code in enumerate(clusters):
+        zone = index.zones[zone_code]
+        total = int(index.zone_sizes[zone_code])
+        done = int(completed[zone_code])
+        percent = done / total * 100
+        net.add_node(
+            CLUSTER_PREFIX + zone,
+            label=f"{zone}\n{percent:.0f}% complete",
+            title=f"{zone}: {done}/{total} quests completed",
+            shape="box",
+            color=CLUSTER_COLOR,
+            borderWidth=1,
+            x=round(i * (NODE_SPACING + ZONE_SPACING) - width / 2),
+            y=top,
+        )